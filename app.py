@@ -1,71 +1,112 @@
+import os
 import sys
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QThreadPool, Signal, Slot
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
 
 
-import os
-from PySide6.QtWidgets import QSystemTrayIcon, QMenu
-from PySide6.QtGui import QIcon, QAction
-
-def setup_tray(app: QApplication, main_window):
-    """Windows 托盘图标：右键菜单包含 显示/隐藏 与 退出。"""
-    icon_path = os.path.join(os.path.dirname(__file__), "tray.ico")
-    icon = QIcon(icon_path) if os.path.exists(icon_path) else app.windowIcon()
-
-    tray = QSystemTrayIcon(icon, parent=main_window)
-    tray.setToolTip("LyTodo")
-
-    menu = QMenu()
-
-    act_show_hide = QAction("显示/隐藏", tray)
-    act_quit = QAction("退出", tray)
-
-    def toggle_show():
-        if main_window.isVisible():
-            main_window.hide()
-        else:
-            main_window.show()
-            main_window.raise_()
-            main_window.activateWindow()
-
-    def do_quit():
-        # 触发 Qt 正常退出流程（会调用 aboutToQuit / closeEvent 等）
-        tray.hide()
-        app.quit()
-
-    act_show_hide.triggered.connect(toggle_show)
-    act_quit.triggered.connect(do_quit)
-
-    menu.addAction(act_show_hide)
-    menu.addSeparator()
-    menu.addAction(act_quit)
-
-    tray.setContextMenu(menu)
-
-    def on_activated(reason):
-        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
-            toggle_show()
-
-    tray.activated.connect(on_activated)
-    tray.show()
-
-    # 防止被 GC 回收
-    main_window._tray = tray
-    return tray
-
-from repository import JsonRepository
-from version import VERSION
-from controller import AppController
+APP_FONT_FAMILY = "Microsoft YaHei UI"
+APP_FONT_SIZE = 10
+APP_FONT_SUBSTITUTE = "Noto Sans CJK SC"
+
+# 数据文件固定放在程序目录（打包后为 exe 所在目录），不随启动时的工作目录变化
+_HERE = Path(sys.executable if getattr(sys, "frozen", False) else __file__).resolve().parent
+_STORAGE = _HERE / "storage.json"
+
+
+def _storage_path() -> Path:
+    """旧版本把 storage.json 放在启动时的工作目录：程序目录还没有数据文件时迁移过来。
+
+    迁移是复制（连同同步状态旁路文件），原文件保留；程序目录不可写时（如装在 Program Files）
+    使用工作目录下的 storage.json。
+    """
+    if _STORAGE.exists():
+        return _STORAGE
+    legacy = Path.cwd() / "storage.json"
+    if not os.access(_HERE, os.W_OK):
+        return legacy
+    if legacy == _STORAGE or not legacy.exists():
+        return _STORAGE
+    import shutil
+    try:
+        shutil.copy2(legacy, _STORAGE)
+    except OSError:
+        return legacy
+    sidecar = legacy.with_name(legacy.name + ".sync")
+    if sidecar.exists():
+        try:
+            shutil.copy2(sidecar, _STORAGE.with_name(_STORAGE.name + ".sync"))
+        except OSError:
+            pass
+    return _STORAGE
+
+
+class _RepoLoader(QObject):
+    """在线程池中解析 storage.json，完成后回到 GUI 线程创建 AppController。"""
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, app: QApplication, repo):
+        super().__init__(app)
+        self.app = app
+        self.repo = repo
+        self.controller = None
+        self.loaded.connect(self._on_loaded)
+        self.failed.connect(self._on_failed)
+
+    def start(self):
+        QThreadPool.globalInstance().start(self._load)
+
+    def _load(self):
+        # 工作线程：只做文件读取与解析，不触碰任何 QWidget
+        try:
+            state = self.repo.load()
+        except Exception as e:
+            # 异常不能留在线程池里：否则 loaded 永不发出，进程停在 app.exec() 且没有窗口
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        self.loaded.emit(state)
+
+    @Slot(object)
+    def _on_loaded(self, state):
+        from controller import AppController
+        self.controller = AppController(self.repo, self.app, loaded=state)
+        self.controller.show()
+
+    @Slot(str)
+    def _on_failed(self, err: str):
+        from PySide6.QtWidgets import QMessageBox
+        QMessageBox.critical(None, "LyTodo", f"无法读取数据文件：\n{self.repo.path}\n\n{err}")
+        self.app.exit(1)
 
 
 def main():
+    # 面板均为半透明无边框窗口，子控件基本不互相遮挡：关闭 Qt 每次绘制时对不透明兄弟控件的区域扣除
+    # （兄弟控件多时遍历开销大，OBS 同样因此关闭）；须在 QApplication 创建前设置
+    os.environ.setdefault("QT_NO_SUBTRACTOPAQUESIBLINGS", "1")
     app = QApplication(sys.argv)
-    # Modern default font
-    app.setFont(QFont("Microsoft YaHei UI", 10))
-    repo = JsonRepository("storage.json")
-    controller = AppController(repo, app)
-    controller.show()
-    sys.exit(app.exec())
+    # Modern default font：仅 Windows 自带该字体；已是系统默认时跳过 setFont
+    # 须在任何窗口创建（AppController）之前设置，避免已有控件重新 polish
+    if sys.platform == "win32":
+        cur = QApplication.font()
+        if cur.family() != APP_FONT_FAMILY or cur.pointSize() != APP_FONT_SIZE:
+            QApplication.setFont(QFont(APP_FONT_FAMILY, APP_FONT_SIZE))
+    else:
+        # 同步过来的设置可能带 Windows 字体名，直接给出替代字体，省去 fontconfig 回退查找
+        QFont.insertSubstitution(APP_FONT_FAMILY, APP_FONT_SUBSTITUTE)
+    # 延迟导入：QApplication 构造完成后再加载 controller → views → models 依赖链
+    from repository import JsonRepository
+
+    loader = _RepoLoader(app, JsonRepository(_storage_path()))
+    loader.start()
+    # storage.json 在后台解析的同时，GUI 线程预先导入 controller/views
+    import controller  # noqa: F401
+    # 全局样式表只安装一次，须在任何窗口创建之前
+    from views import VIEWS_QSS
+    app.setStyleSheet(VIEWS_QSS)
+    raise SystemExit(app.exec())
 
 
 if __name__ == "__main__":
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
 from typing import List, Dict, Optional, Tuple
-import os
-import tempfile
 
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import Qt, QObject, QThreadPool, QTimer, Signal, Slot
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMenu, QSystemTrayIcon, QMessageBox
 
-from domain import Tag, Settings, now_ts
+from domain import Task, Tag, Settings, now_ts
 from repository import JsonRepository
-from models import TaskListModel, ROLE_TAG
+from models import TaskListModel, ROLE_TAG, ROLE_TEXT
 from version import VERSION
 from views import (
     FramelessMainWindow,
@@ -21,15 +19,53 @@ from views import (
     best_default_font_family,
 )
 from sync_service import SyncService
-from win_hotkey import GlobalHotkey, IS_WINDOWS, WM_HOTKEY, set_topmost
+from win_hotkey import GlobalHotkey, HotkeyEventFilter, IS_WINDOWS, set_topmost
 from startup import set_launch_at_startup
 
 
 CONTROLLER_BUILD = "V1.0"
 APP_STARTUP_NAME = "LyTodo"
+PULL_INTERVAL_MS = 8_000
+PULL_MAX_INTERVAL_MS = 5 * 60_000
 
 
-class AppController:
+class _SyncJob(QObject):
+    """在线程池中执行同步网络 I/O，完成后回到 GUI 线程调用 done(ok, result)。"""
+    finished = Signal(bool, object)
+
+    def __init__(self, work, done, parent: QObject):
+        super().__init__(parent)
+        self._work = work
+        self._done = done
+        self.finished.connect(self._deliver)
+
+    def run(self):
+        # 工作线程：只做网络请求与文件读写/解析，不触碰任何 QWidget
+        try:
+            self.finished.emit(True, self._work())
+        except Exception as e:
+            self.finished.emit(False, e)
+
+    @Slot(bool, object)
+    def _deliver(self, ok, result):
+        try:
+            self._done(ok, result)
+        finally:
+            self.deleteLater()
+
+
+def _pull_remote_state(sync: SyncService):
+    """拉取远端并在内存中解析；远端未变化（304）时返回 None。"""
+    data = sync.pull_bytes()
+    if data is None:
+        if sync.not_modified:
+            # 304：远端未变化，无需解析与合并
+            return None
+        raise RuntimeError("pull失败")
+    return JsonRepository.from_bytes(data)
+
+
+class AppController(QObject):
     """
     LyTodo Controller（重写版，专治缩进炸裂）
 
@@ -38,13 +74,16 @@ class AppController:
     - 同步方案A：启动自动 pull；退出自动 push；可选每60秒定时 push
     """
 
-    def __init__(self, repo: JsonRepository, app):
+    def __init__(self, repo: JsonRepository, app, loaded: Optional[Tuple[List[Task], Settings, List[Tag]]] = None):
+        # 继承 QObject 以便 @Slot 方法注册到元对象，信号直接分发到槽
+        super().__init__()
         self.repo = repo
         self.app = app
         print(f"[LyTodo] controller {CONTROLLER_BUILD}")
 
         # ---------- load ----------
-        tasks, settings, tags = self.repo.load()
+        # loaded：启动时已在后台线程 repo.load() 的结果，避免在 GUI 线程重复解析
+        tasks, settings, tags = loaded if loaded is not None else self.repo.load()
         self.settings: Settings = settings
         self.tags: List[Tag] = tags
 
@@ -57,6 +96,18 @@ class AppController:
         self._creating_new_task = False
         self._creating_new_tag = "默认"
         self._last_auto_sync_ts = 0.0
+        # 同一时间只允许一个后台同步任务，避免并发读写 SyncService 状态
+        self._sync_inflight = False
+        # 上次成功推送时的任务/标签签名（id→updated_at，name→(color, deleted, updated_at)）及存储文件摘要；
+        # None 表示还没有基线，下一次推送整文件
+        self._pushed_sigs: Optional[Tuple[Dict[str, float], Dict[str, tuple], str]] = None
+        # 标签派生数据缓存；修改 self.tags（增删/改名/改色/整体替换）后置 _tags_dirty
+        self._tags_dirty = True
+        self._tag_map: Dict[str, Tag] = {}
+        self._tag_names_cache: List[str] = []
+        self._tag_colors_cache: Dict[str, str] = {}
+        # 上次渲染标签栏时的 (标签名, 当前筛选, 颜色)；内容不变时跳过重建按钮
+        self._tagbar_key: Optional[tuple] = None
 
         # ---------- model ----------
         self.model = TaskListModel(tasks)
@@ -65,11 +116,28 @@ class AppController:
         self.window = FramelessMainWindow()
         self.window.list_view.setModel(self.model)
 
-        fam = self.settings.font_family or best_default_font_family()
+        # 本地写盘防抖：连续修改（拖动窗口、连续编辑）合并为一次 repo.save
+        self._save_pending = False
+        self._save_debounce = QTimer(self.window)
+        self._save_debounce.setSingleShot(True)
+        self._save_debounce.setInterval(300)
+        self._save_debounce.timeout.connect(self._flush_save)
+
+        # 搜索输入防抖：每次按键重启定时器，连续输入停顿 120ms 后只过滤一次
+        self._pending_search = ""
+        self._search_debounce = QTimer(self.window)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(120)
+        self._search_debounce.timeout.connect(self._flush_search)
+
+        # 系统字体列表运行期间不变，只查询一次 QFontDatabase
+        self._default_font_family = best_default_font_family()
+        fam = self.settings.font_family or self._default_font_family
         self.delegate = TaskDelegate(
             font_family=fam,
             font_size=int(self.settings.font_size),
             tag_colors=self._tag_color_map(),
+            color_cache=self.window.tag_color_cache,
         )
         self.window.list_view.setItemDelegate(self.delegate)
 
@@ -89,7 +157,7 @@ class AppController:
         self.window.request_page_context_menu.connect(self.open_page_menu)
         self.window.request_task_context_menu.connect(self.open_task_menu)
         self.window.request_open_top_editor.connect(self.open_top_editor_for_index)
-        self.window.request_search_text.connect(self.on_search)
+        self.window.request_search_text.connect(self._queue_search)
         self.window.request_manual_sync.connect(self.manual_sync)
         # removed header notes button
         self.window.request_move_task.connect(self.on_move_task)
@@ -111,6 +179,7 @@ class AppController:
 
         # ---------- hotkey ----------
         self.hotkey = GlobalHotkey(hotkey_id=1)
+        self._hotkey_filter = None
         self._apply_hotkey()
         self._apply_startup_setting()
 
@@ -120,6 +189,7 @@ class AppController:
             self.settings.sync_base_url,
             self.settings.sync_token,
             getattr(self.settings, "sync_user", "default"),
+            state_path=self.storage_path + ".sync",
         )
 
         self._sync_timer = QTimer(self.window)
@@ -127,8 +197,12 @@ class AppController:
         self._sync_timer.timeout.connect(self._timer_push)
 
         self._pull_timer = QTimer(self.window)
-        self._pull_timer.setInterval(8_000)
+        self._pull_timer.setInterval(PULL_INTERVAL_MS)
         self._pull_timer.timeout.connect(self._timer_pull)
+        # 连续失败次数（指数退避）；窗口隐藏期间暂停定时拉取
+        self._pull_fail_count = 0
+        self._pull_paused = False
+        self.window.visibility_changed.connect(self._on_window_visibility)
 
         # 策略B：本地变更后 3 秒自动 push（防抖）
         self._push_debounce = QTimer(self.window)
@@ -136,21 +210,16 @@ class AppController:
         self._push_debounce.setInterval(3000)
         self._push_debounce.timeout.connect(self._debounced_push)
 
-        if self.settings.sync_enabled and self.sync.available():
+        if self._refresh_sync_ok():
             self._startup_pull_reload()
+            # 拉取后 settings 可能被云端版本替换
+            self._refresh_sync_ok()
 
-        if self.settings.sync_enabled and self.sync.available():
+        if self._sync_ok:
             # periodic pull helps multi-client consistency
             self._pull_timer.start()
-
-            if self.settings.sync_enabled and self.sync.available():
-                try:
-                    self._pull_timer.start()
-                except Exception:
-                    pass
-
-        if self.settings.sync_enabled and self.settings.sync_timer_enabled and self.sync.available():
-            self._sync_timer.start()
+            if self.settings.sync_timer_enabled:
+                self._sync_timer.start()
 
         self.app.aboutToQuit.connect(self._on_app_quit)
 
@@ -160,7 +229,7 @@ class AppController:
 
         # ---------- sync status hint ----------
         try:
-            if self.settings.sync_enabled and self.sync.available():
+            if self._sync_ok:
                 self.window.set_sync_status("同步已启用", ok=True, auto_clear_ms=1800)
             else:
                 self.window.set_sync_status("同步未启用", ok=False, auto_clear_ms=1800)
@@ -174,6 +243,7 @@ class AppController:
 
     # ---------------- persistence ----------------
 
+    @Slot()
     def manual_sync(self):
         """手动同步：pull(合并) + push。用于多端即时刷新。"""
         if not self.settings.sync_enabled:
@@ -182,16 +252,61 @@ class AppController:
         if not self.sync.available():
             self.window.set_sync_status("同步不可用", ok=False, auto_clear_ms=2200)
             return
-        try:
-            self._pull_merge_reload()
-            self.save()
-            ok = self.sync.push_from_file(self.storage_path)
-            self.window.set_sync_status("手动同步完成" if ok else "推送失败", ok=bool(ok), auto_clear_ms=2000)
-        except Exception as e:
-            self.window.set_sync_status(f"同步失败：{e}", ok=False, auto_clear_ms=3500)
+        if self._sync_inflight:
+            self.window.set_sync_status("同步进行中…", ok=True, auto_clear_ms=1500)
+            return
+        sync, path = self.sync, self.storage_path
+
+        def pushed(ok, res, sigs):
+            self._on_push_result(ok, res, sigs)
+            if not ok:
+                self.window.set_sync_status(f"同步失败：{res}", ok=False, auto_clear_ms=3500)
+                return
+            self.window.set_sync_status("手动同步完成" if res else "推送失败", ok=bool(res), auto_clear_ms=2000)
+
+        def pulled(ok, res):
+            try:
+                if not ok:
+                    raise res
+                self._apply_remote_state(res)
+                self._flush_save()
+                sigs = self._push_sigs()
+            except Exception as e:
+                self.window.set_sync_status(f"同步失败：{e}", ok=False, auto_clear_ms=3500)
+                return
+            self._run_sync_async(lambda: sync.push_from_file(path), lambda ok, r: pushed(ok, r, sigs))
+
+        self._run_sync_async(lambda: _pull_remote_state(sync), pulled)
+
+    def _run_sync_async(self, work, done):
+        """work 在线程池执行（网络 I/O），done(ok, result) 在 GUI 线程回调。"""
+        def finish(ok, res):
+            self._sync_inflight = False
+            done(ok, res)
+
+        self._sync_inflight = True
+        job = _SyncJob(work, finish, self)
+        QThreadPool.globalInstance().start(job.run)
+
+    def _persist(self):
+        """用户修改后的统一入口：标记落盘，并按同步策略排队防抖推送；写盘与推送各自合并为一次。"""
+        self.save()
+        self._mark_dirty_and_debounce()
 
     def save(self):
+        """标记需要保存；实际写盘由 _save_debounce 合并后执行。"""
+        self._save_pending = True
+        self._save_debounce.start()
+
+    @Slot()
+    def _flush_save(self):
+        """立即写入尚未落盘的修改（push/退出前调用，保证文件为最新）；无修改时不写。"""
+        self._save_debounce.stop()
+        if not self._save_pending:
+            return
+        self._save_pending = False
         self.repo.save(self.model.get_all_tasks(), self.settings, self.tags)
+
     def _merge_remote_into_local(self, remote_tasks, remote_tags, remote_settings):
         """Merge remote state into local state.
         Tasks: merge by id, keep newer updated_at.
@@ -199,43 +314,54 @@ class AppController:
         Settings: only sync-related settings are merged (avoid overriding local UI/background paths).
         """
         # --- tasks ---
-        local = {t.id: t for t in self.model.get_all_tasks() if getattr(t, "id", "")}
+        # 只在原列表上替换/追加真正变化的任务，无变化时不触碰模型
+        # 远端数据已由 JsonRepository.load / from_dict 规整为 Task/Tag，直接访问字段
+        all_tasks = self.model.get_all_tasks()
+        pos = {t.id: i for i, t in enumerate(all_tasks) if t.id}
+        replaced: Dict[int, Task] = {}
+        added: List[Task] = []
         for rt in remote_tasks or []:
-            tid = str(getattr(rt, "id", "") or "")
+            tid = rt.id
             if not tid:
                 continue
-            lt = local.get(tid)
-            if lt is None:
-                local[tid] = rt
-            else:
-                ru = float(getattr(rt, "updated_at", 0.0) or 0.0)
-                lu = float(getattr(lt, "updated_at", 0.0) or 0.0)
-                if ru >= lu:
-                    local[tid] = rt
-        merged_tasks = list(local.values())
+            i = pos.get(tid)
+            if i is None:
+                pos[tid] = -1
+                added.append(rt)
+            elif i >= 0:
+                lt = all_tasks[i]
+                if rt.updated_at >= lt.updated_at and rt != lt:
+                    replaced[i] = rt
 
         # --- tags ---
+        tags_changed = False
         local_tags = {t.name: t for t in getattr(self, "tags", [])}
         for rt in remote_tags or []:
-            name = str(getattr(rt, "name", "") or "").strip() or "默认"
+            name = rt.name
             lt = local_tags.get(name)
             if lt is None:
                 local_tags[name] = rt
+                tags_changed = True
             else:
-                ru = float(getattr(rt, "updated_at", 0.0) or 0.0)
-                lu = float(getattr(lt, "updated_at", 0.0) or 0.0)
+                ru, lu = rt.updated_at, lt.updated_at
                 if ru >= lu:
-                    lt.color = getattr(rt, "color", "") or lt.color
+                    color = rt.color or lt.color
+                    deleted = rt.deleted
+                    if color != lt.color or deleted != lt.deleted:
+                        tags_changed = True
+                    lt.color = color
                     lt.updated_at = max(lu, ru)
-                    lt.deleted = bool(getattr(rt, "deleted", False))
+                    lt.deleted = deleted
         merged_tags = list(local_tags.values())
 
         # ensure default tags exist
         from domain import Tag
         if not any(t.name == "全部" for t in merged_tags):
             merged_tags.insert(0, Tag(id="", name="全部", color=""))
+            tags_changed = True
         if not any(t.name == "默认" for t in merged_tags):
             merged_tags.append(Tag(id="", name="默认", color=""))
+            tags_changed = True
 
         # --- settings (sync-only) ---
         try:
@@ -247,34 +373,44 @@ class AppController:
             self.settings.sync_strategy_b = bool(getattr(remote_settings, "sync_strategy_b", self.settings.sync_strategy_b))
         except Exception:
             pass
+        self._refresh_sync_ok()
 
         # apply merged
-        self.model.beginResetModel()
-        self.model._tasks = merged_tasks
-        self.model.endResetModel()
-        self.tags = merged_tags
-        self._refresh_tagbar()
+        if replaced or added:
+            # 远端修改可能影响完成/置顶/标签，从而改变可见行与排序
+            self.model.begin_task_layout_change()
+            for i, t in replaced.items():
+                all_tasks[i] = t
+            all_tasks.extend(added)
+            self.model.end_task_layout_change()
+        if tags_changed:
+            self.tags = merged_tags
+            self._tags_dirty = True
+            self._refresh_tagbar()
 
-    def _pull_merge_reload(self):
-        """Pull remote storage to temp, merge into local, refresh UI."""
-        tmpfile = os.path.join(tempfile.gettempdir(), "lytodo_remote_storage.json")
-        ok = self.sync.pull_to_file(tmpfile)
-        if not ok:
-            raise RuntimeError("pull失败")
-        rrepo = JsonRepository(tmpfile)
-        r_tasks, r_settings, r_tags = rrepo.load()
+    def _apply_remote_state(self, loaded):
+        """Merge a pulled (tasks, settings, tags) into local state and refresh UI."""
+        if loaded is None:
+            return
+        r_tasks, r_settings, r_tags = loaded
         self._merge_remote_into_local(r_tasks, r_tags, r_settings)
+        self.save()
         if not getattr(self, "in_completed_mode", False):
             self._apply_filters()
 
+    @Slot(int, int, int, int)
     def on_geometry_changed(self, x: int, y: int, w: int, h: int):
+        st = self.settings
+        # 启动恢复几何同样会经防抖发出：与已保存值相同则不保存
+        if (st.win_x, st.win_y, st.win_w, st.win_h) == (int(x), int(y), int(w), int(h)):
+            return
         self.settings.win_x, self.settings.win_y = int(x), int(y)
         self.settings.win_w, self.settings.win_h = int(w), int(h)
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
     # ---------------- tags ----------------
 
+    @Slot()
     def add_page(self):
         """新增“页面/类别”（即标签）。"""
         from PySide6.QtWidgets import QInputDialog
@@ -286,14 +422,16 @@ class AppController:
             return
         if name in ("全部", "已完成"):
             return
-        if any((t.name == name and not t.deleted) for t in self.tags):
+        if self._tag_alive(name):
             self.set_filter_tag(name)
             return
         self.tags.append(Tag(id="", name=name, color=""))
+        self._tags_dirty = True
         self.save()
         self._refresh_tagbar()
         self.set_filter_tag(name)
 
+    @Slot(str, object)
     def open_page_menu(self, tag_name: str, global_pos):
         """右键页面（标签）菜单：默认/全部不允许删除。"""
         from PySide6.QtWidgets import QMenu
@@ -301,20 +439,14 @@ class AppController:
         if not tag:
             return
         m = QMenu(self.window)
-        act_use = m.addAction("设为当前")
-        act_rename = None
-        act_delete = None
+        handlers = {m.addAction("设为当前"): lambda: self.set_filter_tag(tag)}
         if tag not in ("全部", "默认"):
-            act_rename = m.addAction("重命名")
-            act_delete = m.addAction("删除")
+            handlers[m.addAction("重命名")] = lambda: self.rename_page(tag)
+            handlers[m.addAction("删除")] = lambda: self.delete_page(tag)
 
-        act = m.exec(global_pos)
-        if act == act_use:
-            self.set_filter_tag(tag)
-        elif act == act_rename:
-            self.rename_page(tag)
-        elif act == act_delete:
-            self.delete_page(tag)
+        handler = handlers.get(m.exec(global_pos))
+        if handler is not None:
+            handler()
 
     def rename_page(self, old: str):
         from PySide6.QtWidgets import QInputDialog
@@ -329,7 +461,7 @@ class AppController:
             return
         if new in ("全部", "已完成"):
             return
-        if any((t.name == new and not t.deleted) for t in self.tags):
+        if self._tag_alive(new):
             return
 
         # rename tag object
@@ -337,12 +469,15 @@ class AppController:
             if (not t.deleted) and t.name == old:
                 t.name = new
                 t.updated_at = now_ts()
+        self._tags_dirty = True
 
-        # migrate tasks
-        for i in range(self.model.rowCount()):
-            idx = self.model.index(i, 0)
-            if self.model.data(idx, ROLE_TAG) == old:
-                self.model.setData(idx, new, ROLE_TAG)
+        # migrate tasks（直接遍历任务列表：包含被筛选隐藏的任务）
+        self.model.beginResetModel()
+        for t in self.model.iter_tasks():
+            if (not t.deleted) and t.tag == old:
+                t.tag = new
+                t.touch()
+        self.model.endResetModel()
 
         if self.current_filter == old:
             self.current_filter = new
@@ -357,14 +492,9 @@ class AppController:
         if not name or name in ("全部", "默认"):
             return
 
-        # 统计将被迁移到“默认”的任务数量（包含：未完成/已完成，但不含已删除）
-        move_count = 0
-        try:
-            for t in self.model.get_all_tasks():
-                if (not getattr(t, "deleted", False)) and getattr(t, "tag", "") == name:
-                    move_count += 1
-        except Exception:
-            pass
+        # 将被迁移到“默认”的任务（包含：未完成/已完成，但不含已删除）；确认后直接复用
+        moving = [i for i, t in enumerate(self.model.iter_tasks()) if (not t.deleted) and t.tag == name]
+        move_count = len(moving)
 
         # 删除确认：明确告知“任务会移动到默认”
         from PySide6.QtWidgets import QMessageBox
@@ -384,33 +514,50 @@ class AppController:
             if (not tg.deleted) and tg.name == name:
                 tg.deleted = True
                 tg.updated_at = now_ts()
+        self._tags_dirty = True
 
         # 迁移所有任务（包含隐藏/筛选掉的、已完成的）
-        try:
-            for t in self.model.get_all_tasks():
-                if (not getattr(t, "deleted", False)) and getattr(t, "tag", "") == name:
-                    t.tag = "默认"
-                    try:
-                        t.touch()
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
+        all_tasks = self.model.get_all_tasks()
+        # 确认框期间可能有后台拉取合并（只会原位替换或追加），迁移前再核对一次
+        moving = [i for i in moving if (not all_tasks[i].deleted) and all_tasks[i].tag == name]
+        # 当前在“默认”页时迁移过来的任务会新出现；搜索文本包含标签，搜索中命中结果也会变：都按布局变化刷新
+        relayout = self.current_filter == "默认" or self.model.has_search()
+        if relayout:
+            self.model.begin_task_layout_change()
+        for i in moving:
+            all_tasks[i].tag = "默认"
+            all_tasks[i].touch()
+
+        if relayout:
+            self.model.end_task_layout_change()
+        else:
+            # 标签变化：让标签索引失效；仍可见的行（“全部”视图）只刷新标签
+            self.model.notify_tasks_changed(moving, [ROLE_TAG])
         if self.current_filter == name:
+            # 筛选切换由 _apply_filters 刷新模型
             self.current_filter = "全部"
-
-        self.model.beginResetModel()
-        self.model.endResetModel()
         self.save()
         self._refresh_tagbar()
         self._apply_filters()
 
 
-    def _tag_color_map(self) -> Dict[str, str]:
-        return {t.name: t.color for t in self.tags if (not t.deleted and t.color)}
+    def _rebuild_tag_cache(self):
+        """按 self.tags 重建 name→Tag 索引、标签名列表与颜色表。"""
+        tag_map: Dict[str, Tag] = {}
+        for t in self.tags:
+            # 同名时以未删除的为准
+            cur = tag_map.get(t.name)
+            if cur is None or (cur.deleted and not t.deleted):
+                tag_map[t.name] = t
+        self._tag_map = tag_map
+        # 原地刷新颜色表，并让标签栏/委托共用的 QColor 缓存失效
+        colors = self._tag_colors_cache
+        colors.clear()
+        colors.update((t.name, t.color) for t in self.tags if (not t.deleted and t.color))
+        delegate = getattr(self, "delegate", None)
+        if delegate is not None:
+            delegate.set_colors(colors)
 
-    def _tag_names(self) -> List[str]:
         names = [t.name for t in self.tags if not t.deleted]
         # “已完成”不作为普通标签展示，已完成列表由🗑入口统一管理
         names = [n for n in names if str(n).strip() != "已完成"]
@@ -426,24 +573,52 @@ class AppController:
             if n and n not in seen:
                 out.append(n)
                 seen.add(n)
-        return out
+        self._tag_names_cache = out
+        self._tags_dirty = False
+
+    def _tag_by_name(self) -> Dict[str, Tag]:
+        if self._tags_dirty:
+            self._rebuild_tag_cache()
+        return self._tag_map
+
+    def _tag_alive(self, name: str) -> bool:
+        tg = self._tag_by_name().get(name)
+        return tg is not None and not tg.deleted
+
+    def _tag_color_map(self) -> Dict[str, str]:
+        if self._tags_dirty:
+            self._rebuild_tag_cache()
+        return self._tag_colors_cache
+
+    def _tag_names(self) -> List[str]:
+        if self._tags_dirty:
+            self._rebuild_tag_cache()
+        return self._tag_names_cache
 
     def _is_tag_deleted(self, name: str) -> bool:
         name = str(name or "").strip()
         if not name:
             return False
-        for t in self.tags:
-            if t.name == name and bool(getattr(t, "deleted", False)):
-                return True
-        return False
+        tg = self._tag_by_name().get(name)
+        return tg is not None and bool(tg.deleted)
 
     def _refresh_tagbar(self):
-        self.window.tagbar.set_colors(self._tag_color_map())
-        self.window.tagbar.set_tags(self._tag_names(), self.current_filter)
+        colors = self._tag_color_map()
+        names = self._tag_names()
+        # 按内容比较：_tags_dirty 只表示“可能变化”（如颜色对话框原样关闭）
+        key = (tuple(names), self.current_filter, tuple(colors.items()))
+        if key == self._tagbar_key:
+            return
+        self._tagbar_key = key
+        self.window.tagbar.set_colors(colors)
+        self.window.tagbar.set_tags(names, self.current_filter)
 
     # ---------------- tray ----------------
 
     def _setup_tray(self):
+        # 无系统托盘（部分 Linux 桌面 / 无头环境）时整段跳过，self.tray 为 None
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return None
         tray = QSystemTrayIcon(
             self.app.style().standardIcon(self.app.style().StandardPixmap.SP_ComputerIcon),
             self.app,
@@ -451,6 +626,9 @@ class AppController:
         menu = QMenu()
         a_toggle = QAction("显示/隐藏", menu)
         a_quit = QAction("退出", menu)
+        # 托盘菜单不参与 macOS 应用菜单合并，免去按文本匹配角色
+        a_toggle.setMenuRole(QAction.MenuRole.NoRole)
+        a_quit.setMenuRole(QAction.MenuRole.NoRole)
         a_toggle.triggered.connect(self.toggle_visible)
         a_quit.triggered.connect(self.app.quit)
         menu.addAction(a_toggle)
@@ -458,27 +636,33 @@ class AppController:
         menu.addAction(a_quit)
         tray.setContextMenu(menu)
         tray.activated.connect(lambda r: self.toggle_visible() if r == QSystemTrayIcon.Trigger else None)
+        self.app.aboutToQuit.connect(tray.hide)
         tray.show()
         return tray
 
+    @Slot()
     def toggle_visible(self):
-        if self.window.isVisible():
+        if self.window._is_visible:
             self.window.hide()
         else:
             self._show_raise_force_top()
 
     def _show_raise_force_top(self):
         self.window.show()
-        self.window.raise_()
-        self.window.activateWindow()
+        # raise/activate 延后到 show() 的 expose 处理完之后，避免窗口闪烁
+        QTimer.singleShot(0, self._raise_force_top)
 
+    def _raise_force_top(self):
+        # 已是活动窗口时不再发起置顶/激活请求
+        if self.window.isActiveWindow():
+            return
         # 非常置顶时，通过“临时置顶”确保从其他软件上方弹出
         if (not self.settings.always_on_top) and self.settings.hotkey_force_top and IS_WINDOWS:
             hwnd = int(self.window.winId())
             set_topmost(hwnd, True)
-            self.window.raise_()
-            self.window.activateWindow()
             QTimer.singleShot(900, lambda: set_topmost(hwnd, False))
+        self.window.raise_()
+        self.window.activateWindow()
 
     # ---------------- hotkey ----------------
 
@@ -487,22 +671,16 @@ class AppController:
             return
 
         hwnd = int(self.window.winId())
-        self.hotkey.unregister(hwnd)
+        # register 自行处理换键时的注销；热键未变时不再重复注册
         if self.settings.hotkey_enabled:
             self.hotkey.register(hwnd, self.settings.hotkey_sequence)
+        else:
+            self.hotkey.unregister(hwnd)
 
-        def _nativeEvent(eventType, message):
-            try:
-                import ctypes
-                msg = ctypes.wintypes.MSG.from_address(int(message))
-                if msg.message == WM_HOTKEY:
-                    self._show_raise_force_top()
-                    return True, 0
-            except Exception:
-                pass
-            return False, 0
-
-        self.window.nativeEvent = _nativeEvent  # type: ignore
+        # 过滤器只安装一次；热键注销后不会再收到 WM_HOTKEY
+        if self._hotkey_filter is None:
+            self._hotkey_filter = HotkeyEventFilter(self.hotkey.hotkey_id, self._show_raise_force_top)
+            self.app.installNativeEventFilter(self._hotkey_filter)
 
     # ---------------- filtering / completed mode ----------------
 
@@ -522,9 +700,20 @@ class AppController:
         else:
             self.model.set_tag_filter(None)
 
+    @Slot(str)
+    def _queue_search(self, text: str):
+        self._pending_search = text
+        self._search_debounce.start()
+
+    @Slot()
+    def _flush_search(self):
+        self.on_search(self._pending_search)
+
+    @Slot(str)
     def on_search(self, text: str):
         self.model.set_search(text)
 
+    @Slot(str)
     def set_filter_tag(self, tag: str):
         tag = tag or "全部"
         if tag == "已完成":
@@ -538,6 +727,7 @@ class AppController:
         self._apply_filters()
         self._refresh_tagbar()
 
+    @Slot()
     def enter_completed_mode(self):
         if self.in_completed_mode:
             return
@@ -550,6 +740,7 @@ class AppController:
         self.model.set_completed_only(True)
         self._refresh_tagbar()
 
+    @Slot()
     def exit_completed_mode(self):
         if not self.in_completed_mode:
             return
@@ -563,6 +754,7 @@ class AppController:
 
     # ---------------- tasks ----------------
 
+    @Slot()
     def add_task(self):
         """点击加号：进入“新建任务”编辑模式。
         - 不创建空白任务占位
@@ -581,7 +773,7 @@ class AppController:
         self._editing_index = None
         self._pending_new_task_id = None
 
-        fam = self.settings.font_family or best_default_font_family()
+        fam = self.settings.font_family or self._default_font_family
         self.window.open_editor("", fam, int(self.settings.font_size))
 
     def _real_index(self, proxy_index) -> int:
@@ -596,6 +788,7 @@ class AppController:
         rows = sorted(set(rows))
         return [self.model.real_index_from_proxy(r) for r in rows]
 
+    @Slot()
     def restore_selected_in_view(self):
         if not self.in_completed_mode:
             return
@@ -603,9 +796,9 @@ class AppController:
         if not idxs:
             return
         self.model.restore_completed(idxs)
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
+    @Slot()
     def delete_selected_in_view(self):
         if not self.in_completed_mode:
             return
@@ -613,24 +806,26 @@ class AppController:
         if not idxs:
             return
         self.model.delete_real_indexes_soft(idxs)
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
+    @Slot()
     def clear_all_completed(self):
         self.model.purge_completed_hard()
         self.save()
 
     # ---------------- editor ----------------
 
+    @Slot(object)
     def open_top_editor_for_index(self, index):
         if not index or not index.isValid():
             return
         self._editing_index = index
         real = self._real_index(index)
         txt = self.model.get_all_tasks()[real].text
-        fam = self.settings.font_family or best_default_font_family()
+        fam = self.settings.font_family or self._default_font_family
         self.window.open_editor(txt, fam, int(self.settings.font_size))
 
+    @Slot(str)
     def commit_top_editor(self, text: str):
         cleaned = (text or "").rstrip()
 
@@ -638,13 +833,9 @@ class AppController:
         if getattr(self, "_creating_new_task", False):
             if cleaned.strip():
                 tag = getattr(self, "_creating_new_tag", "默认") or "默认"
+                # add_task 内部已刷新模型
                 self.model.add_task(cleaned, tag=tag)
-
-                # refresh
-                self.model.beginResetModel()
-                self.model.endResetModel()
-                self.save()
-                self._mark_dirty_and_debounce()
+                self._persist()
                 try:
                     self.window.set_sync_status("已添加", ok=True, auto_clear_ms=900)
                 except Exception:
@@ -659,19 +850,24 @@ class AppController:
         if self._editing_index and self._editing_index.isValid():
             real = self._real_index(self._editing_index)
             t = self.model.get_all_tasks()[real]
-            t.text = cleaned
-            t.touch()
+            if self.model.has_search():
+                # 文本变化可能影响搜索匹配
+                self.model.begin_task_layout_change()
+                t.text = cleaned
+                t.touch()
+                self.model.end_task_layout_change()
+            else:
+                t.text = cleaned
+                t.touch()
+                self.model.notify_task_changed(real, [ROLE_TEXT, Qt.ItemDataRole.EditRole])
 
         self.window.close_editor()
         self._editing_index = None
         self._pending_new_task_id = None
 
-        # refresh
-        self.model.beginResetModel()
-        self.model.endResetModel()
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
+    @Slot()
     def cancel_top_editor(self):
         # 新建模式取消：什么都不做（因为根本没有创建空任务）
         self.window.close_editor()
@@ -684,12 +880,13 @@ class AppController:
     # ---------------- context menu ----------------
 
 
+    @Slot(int, int)
     def on_move_task(self, src_row: int, dst_row: int):
         """拖拽排序回调：仅在“全部 + 非搜索 + 非收集箱”下允许排序。"""
         if getattr(self, "in_completed_mode", False):
             return
         try:
-            if hasattr(self.window, "search") and self.window.search.text().strip():
+            if self.window.search.text().strip():
                 return
         except Exception:
             pass
@@ -700,9 +897,9 @@ class AppController:
             moved = False
 
         if moved:
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
+    @Slot()
     def open_sort_menu(self):
         """顶部“排序/更多”菜单。为避免打扰，尽量保持轻量。"""
         menu = QMenu(self.window)
@@ -723,8 +920,7 @@ class AppController:
         def _toggle_show_completed():
             self.settings.show_completed_in_main = not bool(getattr(self.settings, "show_completed_in_main", True))
             self._apply_filters()
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
         a_show.triggered.connect(_toggle_show_completed)
         menu.addAction(a_show)
@@ -745,6 +941,7 @@ class AppController:
             pass
         menu.exec(self.window.mapToGlobal(self.window.rect().center()))
 
+    @Slot(object, object)
     def open_task_menu(self, global_pos, index):
         menu = QMenu()
 
@@ -782,6 +979,8 @@ class AppController:
     def _set_item_tag(self, index, tag: str):
         real = self._real_index(index)
         t = self.model.get_all_tasks()[real]
+        # 改标签可能使该行移出当前筛选
+        self.model.begin_task_layout_change()
         t.tag = tag or "默认"
         t.touch()
 
@@ -790,27 +989,24 @@ class AppController:
                 t.tag = "默认"
             else:
                 self.tags.append(Tag(id="", name=t.tag))
-        self.model.beginResetModel()
-        self.model.endResetModel()
+                self._tags_dirty = True
+        self.model.end_task_layout_change()
         self._refresh_tagbar()
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
     def toggle_pin(self, index):
         real = self._real_index(index)
         t = self.model.get_all_tasks()[real]
+        self.model.begin_task_layout_change()
         t.pinned = not t.pinned
         t.touch()
-        self.model.beginResetModel()
-        self.model.endResetModel()
-        self.save()
-        self._mark_dirty_and_debounce()
+        self.model.end_task_layout_change()
+        self._persist()
 
     def delete_task(self, index):
         real = self._real_index(index)
         self.model.delete_real_indexes_soft([real])
-        self.save()
-        self._mark_dirty_and_debounce()
+        self._persist()
 
     def edit_task_dialog(self, index):
         real = self._real_index(index)
@@ -827,6 +1023,8 @@ class AppController:
                 self.model.delete_real_indexes_soft([real])
             else:
                 v = dlg.values()
+                # 完成/置顶/标签都会影响可见性与排序
+                self.model.begin_task_layout_change()
                 t.text = v["text"] or t.text
                 t.note = v["note"]
                 t.tag = v["tag"] or "默认"
@@ -839,14 +1037,14 @@ class AppController:
                         t.tag = "默认"
                     else:
                         self.tags.append(Tag(id="", name=t.tag))
-            self.model.beginResetModel()
-            self.model.endResetModel()
+                        self._tags_dirty = True
+                self.model.end_task_layout_change()
             self._refresh_tagbar()
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
     # ---------------- tag manager ----------------
 
+    @Slot()
     def open_tag_manager(self):
         if self.in_completed_mode:
             QMessageBox.information(self.window, "提示", "请先返回主列表再管理标签。")
@@ -855,14 +1053,24 @@ class AppController:
         dlg = TagManagerDialog(self._tag_names(), self._tag_color_map(), parent=self.window)
 
         def on_colors_changed(colors: dict):
+            # 只改颜色不影响名称/索引：直接修补颜色表中变化的项，不整体重建标签缓存
+            color_map = self._tag_color_map()
+            changed = False
             for tg in self.tags:
-                if tg.name in colors:
+                if tg.name in colors and tg.color != colors[tg.name]:
                     tg.color = colors[tg.name]
-            self.delegate.tag_colors = self._tag_color_map()
+                    changed = True
+                    if not tg.deleted:
+                        if tg.color:
+                            color_map[tg.name] = tg.color
+                        else:
+                            color_map.pop(tg.name, None)
+            if not changed:
+                return
+            self.delegate.tag_colors = color_map
             self._refresh_tagbar()
             self.window.list_view.viewport().update()
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
         def on_tags_changed(names: list):
             names = [str(x).strip() for x in (names or []) if str(x).strip()]
@@ -873,6 +1081,10 @@ class AppController:
             if "已完成" not in names:
                 names.append("已完成")
 
+            # 名称与顺序都没变（例如直接关闭对话框）：不重建标签、不刷新、不保存
+            if [t.name for t in self.tags if not t.deleted] == names:
+                return
+
             old = {t.name: t for t in self.tags}
             keep = set(names)
 
@@ -890,10 +1102,10 @@ class AppController:
                     new_tags.append(tg)
 
             self.tags = new_tags
+            self._tags_dirty = True
             self.delegate.tag_colors = self._tag_color_map()
             self._refresh_tagbar()
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
         dlg.colors_changed.connect(on_colors_changed)
         dlg.tags_changed.connect(on_tags_changed)
@@ -903,6 +1115,7 @@ class AppController:
     # ---------------- settings ----------------
 
 
+    @Slot()
     def open_settings(self):
         dlg = SettingsDialog(self.settings, parent=self.window)
         dlg.request_purge_completed.connect(self.clear_all_completed)
@@ -929,9 +1142,8 @@ class AppController:
             self.settings.sync_timer_enabled = bool(v.get("sync_timer_enabled", True))
 
             # apply UI
-            fam = self.settings.font_family or best_default_font_family()
-            self.delegate.font_family = fam
-            self.delegate.font_size = int(self.settings.font_size)
+            fam = self.settings.font_family or self._default_font_family
+            self.delegate.set_font(fam, int(self.settings.font_size))
 
             self.window.panel_alpha = int(self.settings.panel_opacity)
             self.window.set_window_flags(self.settings.always_on_top)
@@ -941,21 +1153,23 @@ class AppController:
             self._apply_startup_setting()
 
             # apply sync
-            self.sync = SyncService(self.settings.sync_base_url, self.settings.sync_token, self.settings.sync_user)
+            self.sync = SyncService(self.settings.sync_base_url, self.settings.sync_token, self.settings.sync_user,
+                                    state_path=self.storage_path + ".sync")
+            self._pushed_sigs = None
+            self._refresh_sync_ok()
             self._sync_timer.stop()
             try:
                 self._pull_timer.stop()
             except Exception:
                 pass
-            if self.settings.sync_enabled and self.settings.sync_timer_enabled and self.sync.available():
+            if self._sync_ok and self.settings.sync_timer_enabled:
                 self._sync_timer.start()
 
             if not self.in_completed_mode:
                 self._apply_filters()
 
             self._refresh_tagbar()
-            self.save()
-            self._mark_dirty_and_debounce()
+            self._persist()
 
     def _apply_startup_setting(self):
         set_launch_at_startup(APP_STARTUP_NAME, bool(getattr(self.settings, "launch_at_startup", False)))
@@ -963,70 +1177,179 @@ class AppController:
     # ---------------- sync ----------------
 
 
+    def _refresh_sync_ok(self) -> bool:
+        """重新计算“同步已开启且可用”；在 settings 或 self.sync 变化后调用。"""
+        self._sync_ok = bool(self.settings.sync_enabled) and self.sync.available()
+        # 策略B（编辑后防抖推送）是否生效；关闭时连防抖定时器都不启动，已排队的推送也取消
+        self._auto_push = self._sync_ok and bool(getattr(self.settings, "sync_strategy_b", True))
+        if not self._auto_push:
+            self._push_debounce.stop()
+        return self._sync_ok
+
     def _mark_dirty_and_debounce(self):
-        if not (self.settings.sync_enabled and self.sync.available()):
-            return
-        if not getattr(self.settings, "sync_strategy_b", True):
-            return
-        self._push_debounce.start()
+        if self._auto_push:
+            self._push_debounce.start()
 
+    @Slot()
     def _debounced_push(self):
-        if not (self.settings.sync_enabled and self.sync.available()):
+        if not self._sync_ok:
+            return
+        if self._sync_inflight:
+            # 上一次同步尚未结束：稍后再推
+            self._push_debounce.start()
             return
         try:
-            self.save()
-            self.sync.push_from_file(self.storage_path)
+            self._flush_save()
+            work, sigs = self._prepare_push()
+        except Exception as e:
+            self._on_debounced_push_done(False, e)
+            return
+        if work is None:
+            return
+        self._run_sync_async(work, lambda ok, res: self._on_debounced_push_done(ok, res, sigs))
+
+    def _push_sigs(self):
+        tasks = {t.id: t.updated_at for t in self.model.iter_tasks()}
+        tags = {t.name: (t.color, t.deleted, t.updated_at) for t in self.tags}
+        return tasks, tags, self._storage_digest()
+
+    def _storage_digest(self) -> str:
+        digest = getattr(self.repo, "content_digest", None)
+        return digest() if digest is not None else ""
+
+    def _push_unchanged(self) -> bool:
+        """存储文件内容与上次成功推送时一致（需先 _flush_save）。"""
+        base = self._pushed_sigs
+        if base is None or not base[2]:
+            return False
+        return base[2] == self._storage_digest()
+
+    def _prepare_push(self):
+        """在 GUI 线程算出相对上次推送的变化，返回 (work, sigs)；work 在线程池执行推送。
+
+        有任务/标签从本地消失（彻底删除、改名）或还没有基线时，退回整文件推送；
+        存储文件与上次推送完全一致时 work 为 None，调用方直接跳过。
+        """
+        if self._push_unchanged():
+            return None, None
+        sync, path = self.sync, self.storage_path
+        sigs = self._push_sigs()
+        base = self._pushed_sigs
+        task_sigs, tag_sigs, _ = sigs
+        if base is None or any(k not in task_sigs for k in base[0]) or any(k not in tag_sigs for k in base[1]):
+            return (lambda: sync.push_from_file(path)), sigs
+
+        base_tasks, base_tags, _ = base
+        tasks = [t.to_dict() for t in self.model.iter_tasks() if base_tasks.get(t.id) != t.updated_at]
+        tags = [t.to_dict() for t in self.tags if base_tags.get(t.name) != tag_sigs[t.name]]
+        settings = self.settings.to_dict()
+
+        def work():
+            # 服务端不支持 /storage/delta 或没有基线时回退整文件
+            return sync.push_delta(tasks, tags, settings) or sync.push_from_file(path)
+
+        return work, sigs
+
+    def _on_push_result(self, ok, res, sigs):
+        if ok and res:
+            self._pushed_sigs = sigs
+        elif ok and self.sync.conflict:
+            self._resolve_push_conflict()
+
+    def _resolve_push_conflict(self):
+        """整文件推送被 412 拒绝：先拉取远端合并进本地，再排队重新推送。"""
+        sync = self.sync
+
+        def done(ok, res):
+            if not ok:
+                return
+            try:
+                self._apply_remote_state(res)
+            except Exception:
+                return
+            self._mark_dirty_and_debounce()
+
+        self._run_sync_async(lambda: _pull_remote_state(sync), done)
+
+    def _on_debounced_push_done(self, ok, res, sigs=None):
+        if sigs is not None:
+            self._on_push_result(ok, res, sigs)
+        if ok and not res and self.sync.conflict:
+            # 远端已被其他端修改：_on_push_result 已转入“先拉取合并再推送”，不提示失败
+            return
+        if ok and res:
             import time
             now = time.time()
             # 自动同步提示节流：避免频繁闪烁
             if (now - float(self._last_auto_sync_ts)) >= 8.0:
                 self.window.set_sync_status("已自动同步", ok=True, auto_clear_ms=1200)
                 self._last_auto_sync_ts = now
-        except Exception as e:
-            self.window.set_sync_status("同步失败", ok=False, auto_clear_ms=3500)
-            # 可选：托盘气泡（若你启用了托盘）
-            try:
-                if hasattr(self, "tray") and self.tray:
-                    self.tray.showMessage("LyTodo", f"同步失败：{e}", 3000)
-            except Exception:
-                pass
+            return
+        if ok:
+            # 请求已完成但被拒绝/网络失败：原因由 SyncService 记录
+            res = self.sync.last_error or "推送失败"
+        self.window.set_sync_status("同步失败", ok=False, auto_clear_ms=3500)
+        # 可选：托盘气泡（若你启用了托盘）
+        try:
+            if hasattr(self, "tray") and self.tray:
+                self.tray.showMessage("LyTodo", f"同步失败：{res}", 3000)
+        except Exception:
+            pass
 
 
+    @Slot()
     def _timer_pull(self):
         """后台定时拉取远端并合并到本地（静默）。"""
+        if not self._sync_ok:
+            return
+        if self._sync_inflight:
+            return
+        sync = self.sync
+        self._run_sync_async(lambda: _pull_remote_state(sync), self._on_timer_pull_done)
+
+    def _on_timer_pull_done(self, ok, res):
+        if not ok:
+            # 网络/服务端失败：间隔翻倍，最长 5 分钟
+            self._pull_fail_count += 1
+            self._pull_timer.setInterval(min(PULL_INTERVAL_MS * (2 ** self._pull_fail_count), PULL_MAX_INTERVAL_MS))
+            return
+        if self._pull_fail_count:
+            self._pull_fail_count = 0
+            self._pull_timer.setInterval(PULL_INTERVAL_MS)
         try:
-            if not (self.settings.sync_enabled and self.sync.available()):
-                return
-            self._pull_merge_reload()
+            self._apply_remote_state(res)
         except Exception:
             pass
 
-
-    def _timer_push(self):
-        # 后台定时推送：每60秒调用一次（不走防抖）
-        if not (self.settings.sync_enabled and self.sync.available()):
-            return
-        try:
-            self.save()
-            self.sync.push_from_file(self.storage_path)
-            self.window.set_sync_status("同步成功", ok=True, auto_clear_ms=1000)
-        except Exception as e:
-            self.window.set_sync_status("同步失败", ok=False, auto_clear_ms=3500)
-            try:
-                if hasattr(self, "tray") and self.tray:
-                    self.tray.showMessage("LyTodo", f"同步失败：{e}", 3000)
-            except Exception:
-                pass
+    @Slot(bool)
+    def _on_window_visibility(self, visible: bool):
+        if not visible:
+            if self._pull_timer.isActive():
+                self._pull_timer.stop()
+                self._pull_paused = True
+        elif self._pull_paused:
+            self._pull_paused = False
+            self._pull_timer.start()
+            # 重新显示时立即拉一次，补上隐藏期间的远端修改
+            QTimer.singleShot(0, self._timer_pull)
 
     def _startup_pull_reload(self):
-        if not self.sync.pull_to_file(self.storage_path):
+        # 在 GUI 线程、首个窗口显示前同步执行：不重试、短超时
+        data = self.sync.pull_bytes(blocking=True)
+        if data is None:
+            if self.sync.not_modified:
+                # 持久化的 ETag 命中 304：云端自上次同步后未变化，直接用本地文件
+                return
             try:
                 self.window.set_sync_status("云端拉取失败/无更新", ok=False, auto_clear_ms=2200)
             except Exception:
                 pass
             return
+        # 拉到的内容只在内存解析一次，确认有效后再原样落盘（不再写盘后重新读取解析）
         try:
-            tasks, settings, tags = self.repo.load()
+            tasks, settings, tags = JsonRepository.from_bytes(data)
+            self.sync.backup_file(self.storage_path)
+            self.repo.write_bytes(data)
         except Exception:
             return
 
@@ -1037,6 +1360,7 @@ class AppController:
 
         self.settings = settings
         self.tags = tags
+        self._tags_dirty = True
         self.model = TaskListModel(tasks)
         self.window.list_view.setModel(self.model)
         self.window.list_view.setItemDelegate(self.delegate)
@@ -1048,9 +1372,8 @@ class AppController:
         self.window.move(int(self.settings.win_x), int(self.settings.win_y))
 
         # apply delegate
-        fam = self.settings.font_family or best_default_font_family()
-        self.delegate.font_family = fam
-        self.delegate.font_size = int(self.settings.font_size)
+        fam = self.settings.font_family or self._default_font_family
+        self.delegate.set_font(fam, int(self.settings.font_size))
         self.delegate.tag_colors = self._tag_color_map()
 
         # reset to normal mode
@@ -1060,17 +1383,28 @@ class AppController:
         self._apply_filters()
         self._refresh_tagbar()
 
+    @Slot()
     def _timer_push(self):
-        if not (self.settings.sync_enabled and self.sync.available()):
+        # 后台定时推送：每60秒调用一次（不走防抖，静默）
+        if not self._sync_ok:
             return
-        self.save()
-        self.sync.push_from_file(self.storage_path)
+        if self._sync_inflight:
+            return
+        self._flush_save()
+        work, sigs = self._prepare_push()
+        if work is None:
+            return
+        self._run_sync_async(work, lambda ok, res: self._on_push_result(ok, res, sigs))
 
+    @Slot()
     def _on_app_quit(self):
-        if not (self.settings.sync_enabled and self.sync.available()):
-            return
+        # 先落盘防抖中尚未写入的修改（无论是否开启同步）
         try:
-            self.save()
+            self.window.flush_geometry()
+            self._flush_save()
         except Exception:
             pass
-        self.sync.push_from_file(self.storage_path)
+        if not self._sync_ok or self._push_unchanged():
+            return
+        # 退出前最后一次推送来不及 pull 合并：无条件覆盖（与以往行为一致）
+        self.sync.push_from_file(self.storage_path, force=True, blocking=True)
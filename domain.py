@@ -14,7 +14,7 @@ def new_id() -> str:
     return str(uuid.uuid4())
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     id: str
     text: str
@@ -29,11 +29,10 @@ class Task:
     deleted: bool = False
 
     def __post_init__(self):
-        t = now_ts()
         if not self.id:
             self.id = new_id()
         if not self.created_at:
-            self.created_at = t
+            self.created_at = now_ts()
         if not self.updated_at:
             self.updated_at = self.created_at
         if not self.order:
@@ -56,10 +55,17 @@ class Task:
             self.completed_at = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # 手写字段而不用 asdict：后者递归深拷贝，每次保存/推送对全部任务调用时开销明显
+        return {
+            "id": self.id, "text": self.text, "tag": self.tag, "done": self.done,
+            "pinned": self.pinned, "note": self.note, "created_at": self.created_at,
+            "updated_at": self.updated_at, "completed_at": self.completed_at,
+            "order": self.order, "deleted": self.deleted,
+        }
 
     @staticmethod
-    def from_dict(d: Dict[str, Any]) -> "Task":
+    def from_dict(d: Dict[str, Any], now: Optional[float] = None) -> "Task":
+        """now：批量加载时由调用方取一次当前时间传入，避免每条任务都调用 time.time()。"""
         tid = str(d.get("id") or "") or new_id()
         text = str(d.get("text", ""))
         tag = str(d.get("tag", "默认") or "默认")
@@ -70,7 +76,7 @@ class Task:
         updated_at = float(d.get("updated_at", 0.0) or 0.0)
 
         if not created_at:
-            created_at = float(d.get("created_ts", 0.0) or 0.0) or now_ts()
+            created_at = float(d.get("created_ts", 0.0) or 0.0) or (now if now is not None else now_ts())
         if not updated_at:
             updated_at = created_at
 
@@ -94,7 +100,7 @@ class Task:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Tag:
     id: str
     name: str
@@ -109,20 +115,20 @@ class Tag:
             self.updated_at = now_ts()
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {"id": self.id, "name": self.name, "color": self.color, "updated_at": self.updated_at, "deleted": self.deleted}
 
     @staticmethod
-    def from_dict(d: Dict[str, Any]) -> "Tag":
+    def from_dict(d: Dict[str, Any], now: Optional[float] = None) -> "Tag":
         return Tag(
             id=str(d.get("id") or "") or new_id(),
             name=str(d.get("name") or "").strip() or "默认",
             color=str(d.get("color") or ""),
-            updated_at=float(d.get("updated_at", 0.0) or 0.0) or now_ts(),
+            updated_at=float(d.get("updated_at", 0.0) or 0.0) or (now if now is not None else now_ts()),
             deleted=bool(d.get("deleted", False)),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Settings:
     show_completed_in_main: bool = True
     auto_archive_completed: bool = True
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Set
 from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
 
 from domain import Task
@@ -13,6 +14,48 @@ ROLE_PINNED = Qt.ItemDataRole.UserRole + 4
 ROLE_ID = Qt.ItemDataRole.UserRole + 5
 ROLE_ORDER = Qt.ItemDataRole.UserRole + 6
 
+_ROLE_GETTERS = {
+    ROLE_TEXT: Task.first_line,
+    ROLE_DONE: attrgetter("done"),
+    ROLE_TAG: attrgetter("tag"),
+    ROLE_NOTE: attrgetter("note"),
+    ROLE_PINNED: attrgetter("pinned"),
+    ROLE_ID: attrgetter("id"),
+    ROLE_ORDER: attrgetter("order"),
+    Qt.ItemDataRole.EditRole: attrgetter("text"),
+}
+
+# 这些角色的变化会影响搜索文本 / 标签索引
+_TEXT_ROLES = frozenset((ROLE_TEXT, ROLE_TAG, ROLE_NOTE, Qt.ItemDataRole.EditRole))
+
+
+def _runs(rows: List[int]) -> List[tuple]:
+    """升序行号 → 连续区间 [(first, last), ...]。"""
+    out = []
+    for row in rows:
+        if out and row == out[-1][1] + 1:
+            out[-1] = (out[-1][0], row)
+        else:
+            out.append((row, row))
+    return out
+
+
+def _single_move(old: List[int], new: List[int]) -> Optional[tuple]:
+    """new 是否由 old 移动一个元素得到；是则返回 (源行, 目标行)。"""
+    n = len(old)
+    lo = 0
+    while lo < n and old[lo] == new[lo]:
+        lo += 1
+    hi = n - 1
+    while hi > lo and old[hi] == new[hi]:
+        hi -= 1
+    # 差异区间 [lo, hi] 内只能是首元素移到末尾或末尾元素移到开头
+    if old[lo + 1:hi + 1] == new[lo:hi]:
+        return lo, hi
+    if old[lo:hi] == new[lo + 1:hi + 1]:
+        return hi, lo
+    return None
+
 
 class TaskListModel(QAbstractListModel):
     def __init__(self, tasks: List[Task]):
@@ -22,110 +65,193 @@ class TaskListModel(QAbstractListModel):
         self._completed_only = False
         self._tag_filter: Optional[str] = None
         self._search: str = ""
+        self._search_lower: str = ""
+        self._layout_prev = None
+        # 可见行（真实下标）缓存：data()/rowCount() 每次调用都要用，只在模型刷新时失效
+        self._vis_cache: Optional[List[int]] = None
+        # 搜索用小写文本缓存（真实下标 -> text/note/tag 拼接后的小写串）与标签倒排索引，任务内容变化时失效
+        self._lower_cache: Dict[int, str] = {}
+        self._by_tag: Optional[Dict[str, Set[int]]] = None
+        # 上一次搜索的 (关键字, 命中的真实下标)：继续输入时关键字只会变长，只需在上次命中里再筛
+        self._search_hits: Optional[tuple] = None
 
     def rowCount(self, parent=QModelIndex()) -> int:
         if parent.isValid():
             return 0
         return len(self._visible_real_indexes())
 
-    def _visible_real_indexes(self) -> List[int]:
-        idxs = [i for i, t in enumerate(self._tasks) if not t.deleted]
-
-        if self._completed_only:
-            idxs = [i for i in idxs if self._tasks[i].done]
+    def endResetModel(self):
+        # 任何 reset（含控制器直接 begin/endResetModel 包裹的修改）都让可见行缓存失效
+        self._vis_cache = None
+        self._invalidate_text_index()
+        super().endResetModel()
 
-        if (not self._completed_only) and (not self._show_completed):
-            idxs = [i for i in idxs if not self._tasks[i].done]
+    def _end_filter_reset(self):
+        # 只改了筛选条件：可见行缓存失效，但任务内容未变，保留搜索/标签索引
+        self._vis_cache = None
+        super().endResetModel()
 
-        if self._tag_filter and self._tag_filter != "全部":
-            idxs = [i for i in idxs if self._tasks[i].tag == self._tag_filter]
-
-        if self._search:
-            s = self._search.lower()
-            def match(t: Task) -> bool:
-                return (s in (t.text or "").lower()) or (s in (t.note or "").lower()) or (s in (t.tag or "").lower())
-            idxs = [i for i in idxs if match(self._tasks[i])]
+    def _invalidate_text_index(self, real_indexes: Optional[List[int]] = None, tags: bool = True):
+        if real_indexes is None:
+            self._lower_cache.clear()
+        else:
+            for i in real_indexes:
+                self._lower_cache.pop(i, None)
+        if tags:
+            self._by_tag = None
+        self._search_hits = None
+
+    def _lower_text(self, i: int) -> str:
+        s = self._lower_cache.get(i)
+        if s is None:
+            t = self._tasks[i]
+            s = ((t.text or "") + "\x01" + (t.note or "") + "\x01" + (t.tag or "")).lower()
+            self._lower_cache[i] = s
+        return s
+
+    def _tag_index(self) -> Dict[str, Set[int]]:
+        if self._by_tag is None:
+            by_tag: Dict[str, Set[int]] = {}
+            for i, t in enumerate(self._tasks):
+                by_tag.setdefault(t.tag, set()).add(i)
+            self._by_tag = by_tag
+        return self._by_tag
+
+    def _search_matches(self, s: str) -> List[int]:
+        """全部任务中文本/备注/标签包含 s 的真实下标（升序）；s 包含上次关键字时增量筛选。"""
+        hits = self._search_hits
+        pool = hits[1] if (hits is not None and hits[0] in s) else range(len(self._tasks))
+        lower_text = self._lower_text
+        matched = [i for i in pool if s in lower_text(i)]
+        self._search_hits = (s, matched)
+        return matched
 
-        pinned = sorted([i for i in idxs if self._tasks[i].pinned], key=lambda i: -float(self._tasks[i].order))
-        normal = sorted([i for i in idxs if not self._tasks[i].pinned], key=lambda i: -float(self._tasks[i].order))
-        return pinned + normal
+    def _visible_real_indexes(self) -> List[int]:
+        if self._vis_cache is None:
+            self._vis_cache = self._compute_visible()
+        return self._vis_cache
+
+    def _compute_visible(self) -> List[int]:
+        tasks = self._tasks
+        completed_only = self._completed_only
+        hide_done = (not completed_only) and (not self._show_completed)
+        tag = self._tag_filter if (self._tag_filter and self._tag_filter != "全部") else None
+        s = self._search_lower
+
+        def keep(i: int) -> bool:
+            t = tasks[i]
+            if t.deleted:
+                return False
+            if completed_only and not t.done:
+                return False
+            if hide_done and t.done:
+                return False
+            return True
+
+        # 搜索时只看关键字命中的任务，指定标签时只看该标签下的任务；
+        # 单次筛选 + 单次排序：置顶在前，组内按 order 降序（稳定排序，同 order 保持原顺序）
+        tag_set = self._tag_index().get(tag, set()) if tag is not None else None
+        if s:
+            candidates = self._search_matches(s)
+            if tag_set is not None:
+                candidates = [i for i in candidates if i in tag_set]
+        else:
+            candidates = sorted(tag_set) if tag_set is not None else range(len(tasks))
+        idxs = [i for i in candidates if keep(i)]
+        idxs.sort(key=lambda i: (not tasks[i].pinned, -float(tasks[i].order)))
+        return idxs
 
     def visible_real_indexes(self) -> List[int]:
-        return self._visible_real_indexes()
+        return list(self._visible_real_indexes())
 
     def data(self, index: QModelIndex, role: int):
         if not index.isValid():
             return None
-        real = self._visible_real_indexes()[index.row()]
-        t = self._tasks[real]
-        if role == ROLE_TEXT:
-            return t.first_line()
-        if role == ROLE_DONE:
-            return t.done
-        if role == ROLE_TAG:
-            return t.tag
-        if role == ROLE_NOTE:
-            return t.note
-        if role == ROLE_PINNED:
-            return t.pinned
-        if role == ROLE_ID:
-            return t.id
-        if role == ROLE_ORDER:
-            return t.order
-        if role == Qt.ItemDataRole.EditRole:
-            return t.text
-        return None
+        getter = _ROLE_GETTERS.get(role)
+        if getter is None:
+            return None
+        return getter(self._tasks[self._visible_real_indexes()[index.row()]])
 
     def set_show_completed(self, show: bool):
+        # 筛选条件未变时不重置（同步拉取后会重复调用 _apply_filters）
+        if self._show_completed == bool(show):
+            return
         self.beginResetModel()
         self._show_completed = bool(show)
-        self.endResetModel()
+        self._end_filter_reset()
 
 
     def set_completed_only(self, enabled: bool):
+        if self._completed_only == bool(enabled):
+            return
         self.beginResetModel()
         self._completed_only = bool(enabled)
-        self.endResetModel()
+        self._end_filter_reset()
 
     def set_tag_filter(self, tag: Optional[str]):
+        if self._tag_filter == tag:
+            return
         self.beginResetModel()
         self._tag_filter = tag
-        self.endResetModel()
+        self._end_filter_reset()
+
+    def has_search(self) -> bool:
+        return bool(self._search)
 
     def set_search(self, text: str):
         self.beginResetModel()
         self._search = (text or "").strip()
-        self.endResetModel()
+        self._search_lower = self._search.lower()
+        self._end_filter_reset()
 
     def add_task(self, text: str = "", tag: str = "默认") -> str:
-        self.beginResetModel()
+        old = self._visible_real_indexes()
         t = Task(id="", text=text, tag=tag or "默认", done=False)
-        max_order = max([x.order for x in self._tasks if (not x.deleted and x.pinned == t.pinned)] + [t.order])
+        max_order = max(t.order, max((x.order for x in self._tasks if (not x.deleted and x.pinned == t.pinned)), default=t.order))
         t.order = max_order + 1.0
         self._tasks.append(t)
-        self.endResetModel()
+        self._search_hits = None
+        if self._by_tag is not None:
+            self._by_tag.setdefault(t.tag, set()).add(len(self._tasks) - 1)
+        self._publish_visible(old)
 
     def get_all_tasks(self) -> List[Task]:
         return self._tasks
 
+    def iter_tasks(self) -> Iterator[Task]:
+        """遍历全部任务（含已删除），不构造新列表。"""
+        return iter(self._tasks)
+
     def get_completed_real_indexes(self) -> List[int]:
         return [i for i, t in enumerate(self._tasks) if (not t.deleted and t.done)]
 
     def restore_completed(self, real_indexes: List[int]):
-        self.beginResetModel()
+        old = self._visible_real_indexes()
         for i in real_indexes:
             if 0 <= i < len(self._tasks):
                 self._tasks[i].done = False
                 self._tasks[i].touch()
-        self.endResetModel()
+        self._publish_visible(old, real_indexes)
+
+    def toggle_done(self, real_index: int):
+        """切换完成状态：可见行不变时只刷新该行（不重置模型）"""
+        if not (0 <= real_index < len(self._tasks)):
+            return
+        old = self._visible_real_indexes()
+        t = self._tasks[real_index]
+        t.done = not bool(t.done)
+        t.touch()
+        # 隐藏已完成 / 仅看已完成时该行会进出列表，由 _publish_visible 发出最小行变化
+        self._publish_visible(old)
+        self.notify_task_changed(real_index, [ROLE_DONE])
 
     def delete_real_indexes_soft(self, real_indexes: List[int]):
-        self.beginResetModel()
+        old = self._visible_real_indexes()
         for i in real_indexes:
             if 0 <= i < len(self._tasks):
                 self._tasks[i].deleted = True
                 self._tasks[i].touch()
-        self.endResetModel()
+        self._publish_visible(old, real_indexes)
 
     def remove_task_hard_by_id(self, task_id: str) -> bool:
         """完全移除某条任务（用于“新增后取消/空提交”时清理占位行）。"""
@@ -148,12 +274,12 @@ class TaskListModel(QAbstractListModel):
         return [i for i, t in enumerate(self._tasks) if (t.deleted)]
 
     def restore_deleted(self, real_indexes: List[int]):
-        self.beginResetModel()
+        old = self._visible_real_indexes()
         for i in real_indexes:
             if 0 <= i < len(self._tasks):
                 self._tasks[i].deleted = False
                 self._tasks[i].touch()
-        self.endResetModel()
+        self._publish_visible(old, real_indexes)
 
     def purge_deleted_hard(self):
         self.beginResetModel()
@@ -163,6 +289,80 @@ class TaskListModel(QAbstractListModel):
     def real_index_from_proxy(self, proxy_row: int) -> int:
         return self._visible_real_indexes()[proxy_row]
 
+    def notify_task_changed(self, real_index: int, roles: Optional[List[int]] = None):
+        """单条任务内容变化（不影响可见性/排序）：只通知该行，而不是重置整个模型。"""
+        if not roles or not _TEXT_ROLES.isdisjoint(roles):
+            self._invalidate_text_index([real_index], tags=(not roles or ROLE_TAG in roles))
+        try:
+            row = self._visible_real_indexes().index(real_index)
+        except ValueError:
+            return
+        idx = self.index(row, 0)
+        self.dataChanged.emit(idx, idx, list(roles or []))
+
+    def notify_tasks_changed(self, real_indexes: List[int], roles: Optional[List[int]] = None):
+        """多条任务内容变化（不影响可见性/排序）：按连续可见行分段发出 dataChanged。"""
+        if not roles or not _TEXT_ROLES.isdisjoint(roles):
+            self._invalidate_text_index(real_indexes, tags=(not roles or ROLE_TAG in roles))
+        wanted = set(real_indexes)
+        rows = [row for row, real in enumerate(self._visible_real_indexes()) if real in wanted]
+        roles = list(roles or [])
+        for first, last in _runs(rows):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, 0), roles)
+
+    def begin_task_layout_change(self):
+        """在修改置顶/标签等影响排序或筛选的字段前调用，与 end_task_layout_change 成对使用。"""
+        self._layout_prev = self._visible_real_indexes()
+
+    def end_task_layout_change(self):
+        old = self._layout_prev
+        self._layout_prev = None
+        # 括号内可能改了文本/标签，甚至追加了任务（同步合并），索引整体失效
+        self._invalidate_text_index()
+        self._publish_visible(old)
+
+    def _publish_visible(self, old: List[int], changed: Optional[List[int]] = None):
+        """任务已修改、可见行缓存仍是修改前的 old：计算新的可见行并发出最小的行变化信号。
+
+        在各 about-to 信号期间缓存保持旧值，视图看到的行数与信号一致：
+        纯删除 → rowsRemoved，纯新增 → rowsInserted，单行移动 → rowsMoved，
+        其他情况 → layoutChanged（按真实下标重映射持久索引）。
+        """
+        new = self._compute_visible()
+        if new != old:
+            old_set, new_set = set(old), set(new)
+            if new_set <= old_set and [r for r in old if r in new_set] == new:
+                cur = old
+                for first, last in reversed(_runs([row for row, r in enumerate(old) if r not in new_set])):
+                    self.beginRemoveRows(QModelIndex(), first, last)
+                    cur = cur[:first] + cur[last + 1:]
+                    self._vis_cache = cur
+                    self.endRemoveRows()
+            elif old_set <= new_set and [r for r in new if r in old_set] == old:
+                for first, last in _runs([row for row, r in enumerate(new) if r not in old_set]):
+                    self.beginInsertRows(QModelIndex(), first, last)
+                    self._vis_cache = new[:last + 1] + [r for r in new[last + 1:] if r in old_set]
+                    self.endInsertRows()
+            elif old_set == new_set and (move := _single_move(old, new)) is not None:
+                src, dst = move
+                self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst + 1 if dst > src else dst)
+                self._vis_cache = new
+                self.endMoveRows()
+            else:
+                self.layoutAboutToBeChanged.emit()
+                old_persistent = self.persistentIndexList()
+                new_row = {real: row for row, real in enumerate(new)}
+                new_persistent = []
+                for p in old_persistent:
+                    row = new_row.get(old[p.row()]) if 0 <= p.row() < len(old) else None
+                    new_persistent.append(self.index(row, 0) if row is not None else QModelIndex())
+                self._vis_cache = new
+                self.changePersistentIndexList(old_persistent, new_persistent)
+                self.layoutChanged.emit()
+        self._vis_cache = new
+        if changed:
+            self.notify_tasks_changed(changed)
+
     
     def flags(self, index: QModelIndex):
         base = super().flags(index)
@@ -219,8 +419,7 @@ class TaskListModel(QAbstractListModel):
         else:
             new_order = (float(prev_order) + float(next_order)) / 2.0
 
-        self.beginResetModel()
         src_task.order = float(new_order)
         src_task.touch()
-        self.endResetModel()
+        self._publish_visible(vis, [src_real])
         return True
@@ -1,13 +1,24 @@
+import hashlib
 import json
 import os
-from typing import List, Tuple, Dict, Any
+import tempfile
+from typing import List, Tuple, Dict, Any, Union
 
 from domain import Task, Tag, Settings, now_ts
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 class JsonRepository:
-    def __init__(self, path: str):
-        self.path = path
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        # 统一存为 str：SyncService 等处按字符串路径使用
+        self.path = os.fspath(path)
+        # 上次写入/读取的文件内容：内容未变时 save() 直接跳过写盘
+        self._last_bytes: bytes = b""
+        self._last_digest: str = ""
 
     def load(self) -> Tuple[List[Task], Settings, List[Tag]]:
         if not os.path.exists(self.path):
@@ -19,61 +30,10 @@ class JsonRepository:
             return tasks, settings, tags
 
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw: Dict[str, Any] = json.load(f)
-
-            settings = Settings.from_dict(raw.get("settings", {}))
-
-            tags_raw = raw.get("tags", [])
-            tags: List[Tag] = []
-            tag_colors = raw.get("tag_colors", {}) if isinstance(raw, dict) else {}
-            if isinstance(tags_raw, list) and tags_raw and isinstance(tags_raw[0], dict):
-                tags = [Tag.from_dict(x) for x in tags_raw]
-            else:
-                names = [str(t) for t in tags_raw] if isinstance(tags_raw, list) else []
-                if not names:
-                    names = ["默认"]
-                if "默认" not in names:
-                    names.append("默认")
-                if "全部" not in names:
-                    names.insert(0, "全部")
-                for n in names:
-                    c = ""
-                    if isinstance(tag_colors, dict):
-                        c = str(tag_colors.get(n, "") or "")
-                    tags.append(Tag(id="", name=n, color=c))
-
-            seen=set(); norm=[]
-            for t in tags:
-                t.name=(t.name or "").strip() or "默认"
-                if t.name in seen: 
-                    continue
-                seen.add(t.name); norm.append(t)
-            tags=norm
-            if not any(t.name=="全部" for t in tags):
-                tags.insert(0, Tag(id="", name="全部"))
-            if not any(t.name=="默认" for t in tags):
-                tags.append(Tag(id="", name="默认"))
-
-            tasks_raw = raw.get("tasks", []) if isinstance(raw, dict) else []
-            tasks = [Task.from_dict(x) for x in tasks_raw] if isinstance(tasks_raw, list) else []
-            if not tasks:
-                tasks = [Task(id="", text="任务样式", tag="默认", done=False)]
-
-            # inject order if missing (respect current list order)
-            max_order = max([t.order for t in tasks] + [now_ts()])
-            step = 0.001
-            for i, t in enumerate(tasks):
-                if not t.order:
-                    t.order = max_order - i*step
-
-            tag_names = {t.name for t in tags if not t.deleted}
-            for task in tasks:
-                if task.tag not in tag_names:
-                    tags.append(Tag(id="", name=task.tag))
-                    tag_names.add(task.tag)
-
-            return tasks, settings, tags
+            with open(self.path, "rb") as f:
+                data = f.read()
+            self._last_bytes, self._last_digest = data, ""
+            return self.from_bytes(data)
         except Exception:
             tasks = [Task(id="", text="任务样式", tag="默认", done=False)]
             settings = Settings()
@@ -81,6 +41,74 @@ class JsonRepository:
             self.save(tasks, settings, tags)
             return tasks, settings, tags
 
+    @staticmethod
+    def from_bytes(data: bytes) -> Tuple[List[Task], Settings, List[Tag]]:
+        """解析 storage.json 内容（不读写文件）；格式错误时抛异常。"""
+        raw = orjson.loads(data) if orjson is not None else json.loads(data.decode("utf-8"))
+        return JsonRepository.from_raw(raw)
+
+    @staticmethod
+    def from_raw(raw: Dict[str, Any]) -> Tuple[List[Task], Settings, List[Tag]]:
+        now = now_ts()
+        settings = Settings.from_dict(raw.get("settings", {}))
+
+        tags_raw = raw.get("tags", [])
+        tags: List[Tag] = []
+        tag_colors = raw.get("tag_colors", {}) if isinstance(raw, dict) else {}
+        if isinstance(tags_raw, list) and tags_raw and isinstance(tags_raw[0], dict):
+            tags = [Tag.from_dict(x, now) for x in tags_raw]
+        else:
+            names = [str(t) for t in tags_raw] if isinstance(tags_raw, list) else []
+            if not names:
+                names = ["默认"]
+            if "默认" not in names:
+                names.append("默认")
+            if "全部" not in names:
+                names.insert(0, "全部")
+            for n in names:
+                c = ""
+                if isinstance(tag_colors, dict):
+                    c = str(tag_colors.get(n, "") or "")
+                tags.append(Tag(id="", name=n, color=c))
+
+        # 一次遍历完成规整 + 去重，name_to_tag 同时用于后续的存在性判断
+        name_to_tag: Dict[str, Tag] = {}
+        for t in tags:
+            t.name = (t.name or "").strip() or "默认"
+            name_to_tag.setdefault(t.name, t)
+        tags = list(name_to_tag.values())
+        if "全部" not in name_to_tag:
+            tags.insert(0, name_to_tag.setdefault("全部", Tag(id="", name="全部")))
+        if "默认" not in name_to_tag:
+            tags.append(name_to_tag.setdefault("默认", Tag(id="", name="默认")))
+
+        tasks_raw = raw.get("tasks", []) if isinstance(raw, dict) else []
+        tasks = [Task.from_dict(x, now) for x in tasks_raw] if isinstance(tasks_raw, list) else []
+        if not tasks:
+            tasks = [Task(id="", text="任务样式", tag="默认", done=False)]
+
+        # inject order if missing (respect current list order)
+        max_order = max(now, max((t.order for t in tasks), default=now))
+        step = 0.001
+        for i, t in enumerate(tasks):
+            if not t.order:
+                t.order = max_order - i*step
+
+        for task in tasks:
+            tg = name_to_tag.get(task.tag)
+            if tg is None or tg.deleted:
+                tg = Tag(id="", name=task.tag)
+                tags.append(tg)
+                name_to_tag[task.tag] = tg
+
+        return tasks, settings, tags
+
+    def content_digest(self) -> str:
+        """最近一次读/写的文件内容 sha256；尚未读写过时返回空串。"""
+        if not self._last_digest and self._last_bytes:
+            self._last_digest = hashlib.sha256(self._last_bytes).hexdigest()
+        return self._last_digest
+
     def save(self, tasks: List[Task], settings: Settings, tags: List[Tag]) -> None:
         payload = {
             "version": 8,
@@ -88,5 +116,28 @@ class JsonRepository:
             "tags": [t.to_dict() for t in tags],
             "tasks": [t.to_dict() for t in tasks],
         }
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        if orjson is not None:
+            data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        self.write_bytes(data)
+
+    def write_bytes(self, data: bytes) -> None:
+        """把已编码好的 storage 内容原子写入 self.path（内容与上次相同则跳过）。"""
+        if data == self._last_bytes and os.path.exists(self.path):
+            return
+        # 同目录临时文件写完并 fsync 后原子替换，写到一半崩溃也不会损坏 storage.json
+        fd, tmp = tempfile.mkstemp(prefix=".lytodo_", suffix=".json", dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(fd, "wb", buffering=1 << 20) as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._last_bytes, self._last_digest = data, ""
\ No newline at end of file
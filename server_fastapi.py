@@ -1,5 +1,6 @@
 """LyTodo 方案A 同步服务端（FastAPI）
 特点：单文件(JSON)上传/下载，原子写入，token 鉴权，支持 ETag/If-None-Match。
+      /storage/delta 只接收变化的任务/标签，按 id/name + updated_at 合并进已有文件。
 运行：
   pip install fastapi uvicorn
   export LYTODO_DATA_DIR=/var/lib/lytodo
@@ -9,11 +10,33 @@
 建议：前面用 Nginx 反代 + HTTPS。
 """
 
-import os, json, hashlib, tempfile
-from fastapi import FastAPI, Header, HTTPException, Response
+import os, json, hashlib, tempfile, asyncio, gzip
+from collections import OrderedDict
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
+try:
+    import xxhash
+except Exception:  # pragma: no cover
+    xxhash = None  # type: ignore
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+def _loads(b: bytes):
+    return orjson.loads(b) if orjson is not None else json.loads(b)
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
 app = FastAPI()
+# 客户端带 Accept-Encoding: gzip 时压缩较大的响应（拉取 storage）
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 DATA_DIR = os.environ.get("LYTODO_DATA_DIR", "./lytodo_data")
 TOKEN = os.environ.get("LYTODO_TOKEN", "")
@@ -25,7 +48,46 @@ def _path(user: str) -> str:
     return os.path.join(DATA_DIR, f"{safe}.json")
 
 def _etag_bytes(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
+    # ETag 只用于判断内容是否变化，不需要密码学强度：优先 xxh3，否则用比 sha256 快的 blake2b。
+    # 带前缀，旧的 sha256 ETag 一律视为不匹配，客户端完整拉取一次后即切换
+    if xxhash is not None:
+        return "x3-" + xxhash.xxh3_128_hexdigest(b)
+    return "b2-" + hashlib.blake2b(b, digest_size=16).hexdigest()
+
+# path -> (mtime_ns, size, etag, bytes)：连续 GET 且文件未改时不重复读盘、不重复算哈希；
+# 按最近使用淘汰，最多缓存 CACHE_MAX 个用户文件
+CACHE_MAX = int(os.environ.get("LYTODO_CACHE_MAX", "64") or 64)
+_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+
+def _cache_put(p: str, st: os.stat_result, et: str, b: bytes) -> None:
+    _CACHE[p] = (st.st_mtime_ns, st.st_size, et, b)
+    _CACHE.move_to_end(p)
+    while len(_CACHE) > CACHE_MAX:
+        _CACHE.popitem(last=False)
+
+def _read_cached(p: str) -> tuple:
+    st = os.stat(p)
+    hit = _CACHE.get(p)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        try:
+            _CACHE.move_to_end(p)
+        except KeyError:
+            pass
+        return hit[2], hit[3]
+    with open(p, "rb") as f:
+        b = f.read()
+    et = _etag_bytes(b)
+    _cache_put(p, st, et, b)
+    return et, b
+
+# 每个用户文件一把锁：同一用户的写入（含 delta 的读-改-写）串行，不同用户互不阻塞
+_USER_LOCKS: dict = {}
+
+def _user_lock(p: str) -> asyncio.Lock:
+    lock = _USER_LOCKS.get(p)
+    if lock is None:
+        lock = _USER_LOCKS.setdefault(p, asyncio.Lock())
+    return lock
 
 def _auth(x_token: str | None):
     if TOKEN and (x_token != TOKEN):
@@ -37,24 +99,98 @@ def get_storage(user: str = "default", if_none_match: str | None = Header(defaul
     p = _path(user)
     if not os.path.exists(p):
         return JSONResponse({"version": 0, "payload": None}, headers={"ETag": "0"})
-    b = open(p, "rb").read()
-    et = _etag_bytes(b)
+    et, b = _read_cached(p)
     if if_none_match and if_none_match.strip('"') == et:
         return Response(status_code=304)
     return Response(content=b, media_type="application/json", headers={"ETag": et})
 
+def _write_atomic(p: str, body: dict) -> str:
+    return _write_bytes(p, _dumps(body))
+
+def _write_bytes(p: str, b: bytes) -> str:
+    et = _etag_bytes(b)
+    hit = _CACHE.get(p)
+    if hit and hit[2] == et:
+        try:
+            st = os.stat(p)
+            if hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+                # 内容未变：不重写文件
+                return et
+        except OSError:
+            pass
+    fd, tmp = tempfile.mkstemp(prefix="lytodo_", suffix=".json", dir=DATA_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _cache_put(p, os.stat(p), et, b)
+    return et
+
+def _merge_records(old: list, new: list, key: str) -> list:
+    """按 key 合并记录：新增直接追加，已存在时 updated_at 不旧于服务端则覆盖。"""
+    out = list(old)
+    pos = {r.get(key): i for i, r in enumerate(out) if isinstance(r, dict)}
+    for r in new:
+        if not isinstance(r, dict):
+            continue
+        i = pos.get(r.get(key))
+        if i is None:
+            pos[r.get(key)] = len(out)
+            out.append(r)
+        elif float(r.get("updated_at", 0) or 0) >= float(out[i].get("updated_at", 0) or 0):
+            out[i] = r
+    return out
+
 @app.post("/storage")
-def put_storage(body: dict, user: str = "default", x_token: str | None = Header(default=None)):
+async def put_storage(request: Request, user: str = "default", x_token: str | None = Header(default=None),
+                      if_match: str | None = Header(default=None)):
     _auth(x_token)
+    # 原样保存客户端上传的字节，不再 dict -> json.dumps 重新编码；只校验是 JSON 对象
+    b = await request.body()
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        try:
+            b = gzip.decompress(b)
+        except (OSError, EOFError):
+            raise HTTPException(status_code=400, detail="invalid gzip body")
+    try:
+        ok = isinstance(_loads(b), dict)
+    except ValueError:
+        ok = False
+    if not ok:
+        raise HTTPException(status_code=422, detail="body must be a JSON object")
     p = _path(user)
-    b = json.dumps(body, ensure_ascii=False, indent=2).encode("utf-8")
-    et = _etag_bytes(b)
+    async with _user_lock(p):
+        # 乐观并发：客户端带 If-Match 且服务端文件已被其他端改过时拒绝，客户端应先 pull 合并
+        if if_match and os.path.exists(p):
+            cur_et = (await asyncio.to_thread(_read_cached, p))[0]
+            if if_match.strip().strip('"') != cur_et:
+                raise HTTPException(status_code=412, detail="storage changed", headers={"ETag": cur_et})
+        et = await asyncio.to_thread(_write_bytes, p, b)
+    return JSONResponse({"ok": True, "etag": et}, headers={"ETag": et})
 
-    # atomic write
-    fd, tmp = tempfile.mkstemp(prefix="lytodo_", suffix=".json", dir=DATA_DIR)
-    os.close(fd)
-    with open(tmp, "wb") as f:
-        f.write(b)
-    os.replace(tmp, p)
+def _apply_delta(p: str, body: dict) -> str:
+    cur = _loads(_read_cached(p)[1])
+    cur["tasks"] = _merge_records(cur.get("tasks") or [], body.get("tasks") or [], "id")
+    cur["tags"] = _merge_records(cur.get("tags") or [], body.get("tags") or [], "name")
+    if isinstance(body.get("settings"), dict):
+        cur["settings"] = body["settings"]
+    return _write_atomic(p, cur)
 
-    return JSONResponse({"ok": True, "etag": et})
+@app.post("/storage/delta")
+async def patch_storage(body: dict, user: str = "default", x_token: str | None = Header(default=None)):
+    _auth(x_token)
+    p = _path(user)
+    if not os.path.exists(p):
+        # 没有基线：让客户端回退为整文件推送
+        raise HTTPException(status_code=409, detail="no base storage")
+    async with _user_lock(p):
+        et = await asyncio.to_thread(_apply_delta, p, body)
+    return JSONResponse({"ok": True, "etag": et}, headers={"ETag": et})
@@ -2,44 +2,83 @@
 用法（Windows）：
   python sync_client.py pull --url http://your_server:8080 --token your_token
   python sync_client.py push --url http://your_server:8080 --token your_token
+  python sync_client.py pull --url http://your_server:8080 --token your_token --users alice,bob
 
 说明：
 - pull：拉取服务器 storage.json 覆盖本地（会备份）
 - push：把本地 storage.json 推到服务器
+- --users：多个用户并发 pull/push（共用一个连接池），每个用户对应 --file 同目录下的 <user>.storage.json
 - 本脚本只依赖 requests：pip install requests
 """
 
-import argparse, os, shutil, time, json
+import argparse, os, shutil
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
 DEFAULT_FILE = "storage.json"
 
-def backup(path: str):
-    if os.path.exists(path):
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        shutil.copy2(path, path + f".bak_{ts}")
+def backup(path: str, keep: int = 3):
+    # 轮换保留 .bak_1（最新）~ .bak_N；随后用 os.replace 写新文件，所以 .bak_1 硬链接旧文件即可
+    if not os.path.exists(path):
+        return
+    for i in range(keep - 1, 0, -1):
+        if os.path.exists(f"{path}.bak_{i}"):
+            os.replace(f"{path}.bak_{i}", f"{path}.bak_{i + 1}")
+    try:
+        os.link(path, path + ".bak_1")
+    except OSError:
+        shutil.copy2(path, path + ".bak_1")
 
-def pull(base_url: str, token: str, user: str, file_path: str):
+def pull(base_url: str, token: str, user: str, file_path: str, http=requests):
     url = base_url.rstrip("/") + "/storage"
     headers = {"X-Token": token} if token else {}
-    r = requests.get(url, params={"user": user}, headers=headers, timeout=15)
+    r = http.get(url, params={"user": user}, headers=headers, timeout=15, stream=True)
     if r.status_code != 200:
         raise SystemExit(f"pull failed: {r.status_code} {r.text}")
+    # 分块写入临时文件，完整收到后再备份并替换，中途断开不会留下半个 storage.json
+    tmp = file_path + ".tmp"
+    with r, open(tmp, "wb") as f:
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            f.write(chunk)
     backup(file_path)
-    with open(file_path, "wb") as f:
-        f.write(r.content)
-    print("pulled ok")
+    os.replace(tmp, file_path)
+    print(f"pulled ok ({user})")
 
-def push(base_url: str, token: str, user: str, file_path: str):
+def push(base_url: str, token: str, user: str, file_path: str, http=requests):
     url = base_url.rstrip("/") + "/storage"
-    if not os.path.exists(file_path):
-        raise SystemExit(f"{file_path} not found")
     headers = {"X-Token": token} if token else {}
-    data = json.load(open(file_path, "r", encoding="utf-8"))
-    r = requests.post(url, params={"user": user}, headers=headers, json=data, timeout=15)
+    headers["Content-Type"] = "application/json; charset=utf-8"
+    # 文件本身就是 JSON：原样上传，不再 json.load 后由 requests 重新编码
+    try:
+        with open(file_path, "rb") as f:
+            body = f.read()
+    except FileNotFoundError:
+        raise SystemExit(f"{file_path} not found")
+    r = http.post(url, params={"user": user}, headers=headers, data=body, timeout=15)
     if r.status_code != 200:
         raise SystemExit(f"push failed: {r.status_code} {r.text}")
-    print("pushed ok, etag=", r.json().get("etag"))
+    print(f"pushed ok ({user}), etag=", r.headers.get("ETag", "").strip('"') or r.json().get("etag"))
+
+def run_many(cmd: str, base_url: str, token: str, users: list, folder: str):
+    # 线程池并发 + 共享 Session：连接复用，N 个用户的耗时接近一次往返
+    fn = pull if cmd == "pull" else push
+    with requests.Session() as s:
+        adapter = HTTPAdapter(pool_maxsize=len(users))
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+
+        def one(user):
+            try:
+                fn(base_url, token, user, os.path.join(folder, f"{user}.storage.json"), http=s)
+                return None
+            except SystemExit as e:
+                return f"{user}: {e}"
+
+        with ThreadPoolExecutor(max_workers=min(8, len(users))) as ex:
+            errors = [e for e in ex.map(one, users) if e]
+    if errors:
+        raise SystemExit("\n".join(errors))
 
 def main():
     ap = argparse.ArgumentParser()
@@ -48,8 +87,12 @@ def main():
     ap.add_argument("--token", default="")
     ap.add_argument("--user", default="default")
     ap.add_argument("--file", default=DEFAULT_FILE)
+    ap.add_argument("--users", default="", help="逗号分隔的多个用户，并发处理")
     args = ap.parse_args()
-    if args.cmd == "pull":
+    users = [u.strip() for u in args.users.split(",") if u.strip()]
+    if users:
+        run_many(args.cmd, args.url, args.token, users, os.path.dirname(args.file))
+    elif args.cmd == "pull":
         pull(args.url, args.token, args.user, args.file)
     else:
         push(args.url, args.token, args.user, args.file)
@@ -1,78 +1,283 @@
 from __future__ import annotations
-import os
+import gzip
+import hashlib
 import json
-import time
+import os
+import shutil
 from typing import Optional
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except Exception:  # pragma: no cover
     requests = None  # type: ignore
 
 
+# 后台线程请求的超时；GUI 线程同步等待的请求（启动拉取 / 退出推送）用更短的 (连接, 读取) 超时且不重试
+_TIMEOUT = 15
+_BLOCKING_TIMEOUT = (3, 5)
+
+
+def _new_session(retry: bool = True):
+    """长连接会话：多次 pull/push 复用同一 TCP/TLS 连接。
+
+    retry=True 时连接失败、读超时与 429/502/503/504 在 urllib3 层退避重试（尊重 Retry-After）；
+    两个 POST 接口都是幂等的（整文件覆盖 / 按 updated_at 合并），可以安全重试。
+    """
+    s = requests.Session()
+    max_retries = 0
+    if retry:
+        max_retries = Retry(
+            total=3, connect=3, read=2, status=3, backoff_factor=0.4,
+            status_forcelist=(429, 502, 503, 504), allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True, raise_on_status=False,
+        )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=max_retries)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
 class SyncService:
-    def __init__(self, base_url: str, token: str, user: str):
+    def __init__(self, base_url: str, token: str, user: str, state_path: Optional[str] = None):
         self.base_url = (base_url or "").rstrip("/")
         self.token = token or ""
         self.user = user or "default"
-        self._etag: Optional[str] = None
+        # state_path：持久化 ETag 的旁路文件，重启后首次 pull 也能走 304
+        self._state_path = state_path
+        self._etag: Optional[str] = self._load_etag()
+        # 最近一次 pull 是否得到 304（远端自上次 pull/push 后未变化，file_path 未写入）
+        self.not_modified = False
+        self._session = _new_session() if requests is not None else None
+        # GUI 线程同步调用用的无重试会话，首次使用时创建
+        self._blocking_session = None
+        if self._session is not None and self.token:
+            # 固定请求头放在会话上，每次请求只补条件头（If-None-Match / If-Match / Content-Type）
+            self._session.headers["X-Token"] = self.token
+        # 服务端是否接受 gzip 请求体；旧服务端拒绝时回退为明文并不再尝试
+        self._gzip_ok = True
+        # 服务端是否有 /storage/delta；旧服务端返回 404/405 后本会话直接整文件推送
+        self._delta_ok = True
+        # 最近一次整文件推送是否因 If-Match 不符被拒（412）：远端已被其他端修改，需先 pull 合并再推
+        self.conflict = False
+        # 上次整文件推送成功时的文件内容 sha256：内容未变时 push_from_file 直接返回，不发请求
+        self._pushed_hash: Optional[str] = None
+        # 最近一次请求失败的原因（网络异常或 HTTP 状态），供界面提示；成功时清空
+        self.last_error = ""
+
+    def _load_etag(self) -> Optional[str]:
+        if not self._state_path:
+            return None
+        try:
+            with open(self._state_path, "rb") as f:
+                st = json.loads(f.read())
+        except Exception:
+            return None
+        # 服务器或用户变了，旧 ETag 没有意义
+        if not isinstance(st, dict) or st.get("base_url") != self.base_url or st.get("user") != self.user:
+            return None
+        return str(st.get("etag") or "") or None
+
+    def _set_etag(self, et: str) -> None:
+        if et == self._etag:
+            return
+        self._etag = et
+        if not self._state_path:
+            return
+        tmp = self._state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"base_url": self.base_url, "user": self.user, "etag": et}, f)
+            os.replace(tmp, self._state_path)
+        except Exception:
+            pass
 
     def available(self) -> bool:
         return bool(self.base_url) and (requests is not None)
 
-    def pull_to_file(self, file_path: str) -> bool:
+    def _session_for(self, blocking: bool):
+        """返回 (会话, 超时)；blocking=True 时调用方在 GUI 线程等待，服务器不可达要尽快失败。"""
+        if not blocking:
+            return self._session, _TIMEOUT
+        if self._blocking_session is None:
+            self._blocking_session = _new_session(retry=False)
+            if self.token:
+                self._blocking_session.headers["X-Token"] = self.token
+        return self._blocking_session, _BLOCKING_TIMEOUT
+
+    def _get_storage(self, stream: bool = False, blocking: bool = False):
+        """GET /storage；200 时返回响应，失败或 304（not_modified=True）时返回 None。"""
+        self.not_modified = False
         if not self.available():
-            return False
+            return None
         url = self.base_url + "/storage"
         headers = {}
-        if self.token:
-            headers["X-Token"] = self.token
         if self._etag:
             headers["If-None-Match"] = self._etag
+        session, timeout = self._session_for(blocking)
+        r = session.get(url, params={"user": self.user}, headers=headers, timeout=timeout, stream=stream)
+        if r.status_code == 304:
+            self.not_modified = True
+        if r.status_code not in (200, 304):
+            self.last_error = f"HTTP {r.status_code}"
+        else:
+            self.last_error = ""
+        if r.status_code != 200:
+            r.close()
+            return None
+        return r
+
+    def _remember_etag(self, r) -> None:
+        # 内容完整收到/写入后再记录 ETag，避免中途失败后下次 pull 误得 304
+        et = r.headers.get("ETag", "")
+        if et:
+            self._set_etag(et.strip('"'))
+
+    def pull_bytes(self, blocking: bool = False) -> Optional[bytes]:
+        """拉取远端 storage 内容；失败或 304（not_modified=True）时返回 None。"""
         try:
-            r = requests.get(url, params={"user": self.user}, headers=headers, timeout=15)
-            if r.status_code == 304:
-                return True
-            if r.status_code != 200:
-                return False
-            et = r.headers.get("ETag", "")
-            if et:
-                self._etag = et.strip('"')
-            # backup
-            if os.path.exists(file_path):
-                ts = time.strftime("%Y%m%d_%H%M%S")
-                try:
-                    import shutil
-                    shutil.copy2(file_path, file_path + f".bak_{ts}")
-                except Exception:
-                    pass
-            with open(file_path, "wb") as f:
-                f.write(r.content)
-            return True
+            r = self._get_storage(blocking=blocking)
+            if r is None:
+                return None
+            data = r.content
+            self._remember_etag(r)
+            return data
+        except OSError as e:
+            # requests 的异常都派生自 OSError（IOError）；其他异常属于程序错误，不在这里吞掉
+            self.last_error = str(e)
+            return None
+
+    @staticmethod
+    def backup_file(file_path: str, keep: int = 3) -> None:
+        """覆盖本地文件前备份：轮换保留 .bak_1（最新）~ .bak_{keep}，不再无限堆积带时间戳的副本。
+
+        调用方随后用 os.replace 写入新文件，因此 .bak_1 用硬链接指向旧文件即可，无需整份复制。
+        """
+        if not os.path.exists(file_path):
+            return
+        try:
+            for i in range(keep - 1, 0, -1):
+                src = f"{file_path}.bak_{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{file_path}.bak_{i + 1}")
+            dst = file_path + ".bak_1"
+            try:
+                os.link(file_path, dst)
+            except OSError:
+                shutil.copy2(file_path, dst)
         except Exception:
+            pass
+
+    def pull_to_file(self, file_path: str) -> bool:
+        """拉取远端并分块流式写入 file_path（先写同目录 .tmp 再原子替换），不在内存里缓冲整个响应。"""
+        try:
+            r = self._get_storage(stream=True)
+        except OSError as e:
+            self.last_error = str(e)
             return False
+        if r is None:
+            return self.not_modified
+        tmp = file_path + ".tmp"
+        try:
+            with r, open(tmp, "wb") as f:
+                for chunk in r.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            self.backup_file(file_path)
+            os.replace(tmp, file_path)
+        except OSError as e:
+            self.last_error = str(e)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        self._remember_etag(r)
+        return True
 
-    def push_from_file(self, file_path: str) -> bool:
-        if not self.available():
+    def push_delta(self, tasks: list, tags: list, settings: Optional[dict] = None) -> bool:
+        """只推送变化的任务/标签（dict 形式），由服务端合并。
+
+        服务端不支持或没有基线时返回 False，调用方应回退到 push_from_file。
+        不更新 ETag：合并后的服务端内容可能包含其他端的修改，下次 pull 需要完整拉取。
+        """
+        if not self.available() or not self._delta_ok:
             return False
-        if not os.path.exists(file_path):
+        url = self.base_url + "/storage/delta"
+        headers = {}
+        body = {"tasks": tasks, "tags": tags}
+        if settings is not None:
+            body["settings"] = settings
+        try:
+            if orjson is not None:
+                headers["Content-Type"] = "application/json"
+                r = self._session.post(url, params={"user": self.user}, headers=headers, data=orjson.dumps(body), timeout=_TIMEOUT)
+            else:
+                r = self._session.post(url, params={"user": self.user}, headers=headers, json=body, timeout=_TIMEOUT)
+            if r.status_code in (404, 405):
+                # 旧服务端没有该接口：记住后不再尝试，同样是正常回退信号
+                self._delta_ok = False
+            # 409（服务端无基线）是正常回退信号，不算错误
+            self.last_error = "" if r.status_code in (200, 404, 405, 409) else f"HTTP {r.status_code}"
+            return r.status_code == 200
+        except OSError as e:
+            self.last_error = str(e)
+            return False
+
+    def push_from_file(self, file_path: str, force: bool = False, blocking: bool = False) -> bool:
+        """整文件推送。已知远端 ETag 时带 If-Match，远端被他人改过则返回 False 并置 conflict；
+        force=True 时无条件覆盖（退出时的最后一次推送）；blocking 含义同 pull_bytes。"""
+        self.conflict = False
+        if not self.available():
             return False
         url = self.base_url + "/storage"
         headers = {}
-        if self.token:
-            headers["X-Token"] = self.token
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        if self._etag and not force:
+            headers["If-Match"] = f'"{self._etag}"'
         try:
-            data = json.load(open(file_path, "r", encoding="utf-8"))
-            r = requests.post(url, params={"user": self.user}, headers=headers, json=data, timeout=15)
+            # 文件本身就是 JSON：原样上传字节，不再解析后重新编码；文件不存在时 open 抛 FileNotFoundError
+            with open(file_path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest == self._pushed_hash:
+                return True
+            session, timeout = self._session_for(blocking)
+            r = None
+            if self._gzip_ok:
+                # JSON 文本重复度高，gzip 后通常只有原来的 1/3~1/10
+                gz_headers = dict(headers, **{"Content-Encoding": "gzip"})
+                r = session.post(url, params={"user": self.user}, headers=gz_headers,
+                                 data=gzip.compress(data, compresslevel=6), timeout=timeout)
+                if r.status_code in (400, 415, 422):
+                    self._gzip_ok = False
+                    r = None
+            if r is None:
+                r = session.post(url, params={"user": self.user}, headers=headers, data=data, timeout=timeout)
+            if r.status_code == 412:
+                self.conflict = True
+                self.last_error = ""
+                return False
             if r.status_code != 200:
+                self.last_error = f"HTTP {r.status_code}"
                 return False
-            try:
-                j = r.json()
-                et = j.get("etag", "")
-                if et:
-                    self._etag = str(et)
-            except Exception:
-                pass
+            et = r.headers.get("ETag", "").strip('"')
+            if not et:
+                # 旧服务端只在响应体里返回 etag
+                try:
+                    et = str(r.json().get("etag", "") or "")
+                except ValueError:
+                    et = ""
+            if et:
+                self._set_etag(et)
+            self._pushed_hash = digest
+            self.last_error = ""
             return True
-        except Exception:
+        except OSError as e:
+            self.last_error = str(e)
             return False
@@ -1,14 +1,16 @@
 from __future__ import annotations
 from typing import List, Tuple, Dict, Optional
+import functools
 import hashlib
 
 from PySide6.QtCore import Qt, QRect, QSize, Signal, QEvent, QPoint, QTimer
-from PySide6.QtGui import QPainter, QColor, QFont, QFontMetrics, QFontDatabase, QKeySequence
+from PySide6.QtGui import QPainter, QBrush, QColor, QFont, QFontMetrics, QFontDatabase, QKeySequence
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QListView, QStyledItemDelegate, QStyleOptionViewItem,
     QDialog, QLabel, QCheckBox, QPushButton, QListWidget, QListWidgetItem,
-    QStyle, QSizeGrip, QTabWidget, QSlider, QFontComboBox, QSpinBox, QTextEdit,
-    QComboBox, QKeySequenceEdit, QFrame, QLineEdit, QColorDialog, QAbstractItemView, QMenu
+    QStyle, QSizeGrip, QTabWidget, QSlider, QSpinBox, QTextEdit,
+    QComboBox, QKeySequenceEdit, QFrame, QLineEdit, QColorDialog, QAbstractItemView,
+    QApplication, QInputDialog
 )
 
 from models import ROLE_DONE, ROLE_TAG, ROLE_PINNED
@@ -23,11 +25,15 @@ def best_default_font_family() -> str:
     return ""
 
 
+@functools.lru_cache(maxsize=512)
+def _hash_rgba(tag: str) -> Tuple[int, int, int, int]:
+    # 同一标签的哈希色固定不变：缓存 (r,g,b,a)，绘制时不再重复算 md5
+    r, g, b = hashlib.md5((tag or "默认").encode("utf-8")).digest()[:3]
+    return ((r + 255) // 2, (g + 255) // 2, (b + 255) // 2, 210)
+
+
 def _hash_color(tag: str) -> QColor:
-    h = hashlib.md5((tag or "默认").encode("utf-8")).hexdigest()
-    r = int(h[0:2], 16); g = int(h[2:4], 16); b = int(h[4:6], 16)
-    r = int((r + 255) / 2); g = int((g + 255) / 2); b = int((b + 255) / 2)
-    return QColor(r, g, b, 210)
+    return QColor(*_hash_rgba(tag or "默认"))
 
 
 def tag_color(tag: str, tag_colors: Dict[str, str]) -> QColor:
@@ -40,6 +46,55 @@ def tag_color(tag: str, tag_colors: Dict[str, str]) -> QColor:
     return _hash_color(tag or "默认")
 
 
+# (字体族, 字号) → (粗体 QFont, QFontMetrics)：字体度量查询字体引擎，按字体设置共享
+_FM_CACHE: Dict[Tuple[str, int], Tuple[QFont, QFontMetrics]] = {}
+
+
+def _get_font_and_fm(family: str, size: int) -> Tuple[QFont, QFontMetrics]:
+    key = (family or "", int(size))
+    hit = _FM_CACHE.get(key)
+    if hit is None:
+        f = QFont()
+        if family:
+            f.setFamily(family)
+        f.setPointSize(int(size))
+        f.setBold(True)
+        hit = (f, QFontMetrics(f))
+        _FM_CACHE[key] = hit
+    return hit
+
+
+@functools.lru_cache(maxsize=16)
+def _panel_brush(alpha: int) -> QBrush:
+    # 面板背景画刷：按透明度缓存，窗口拖动/缩放重绘时不再逐次构造
+    return QBrush(QColor(20, 25, 35, alpha))
+
+
+class TagColorCache:
+    """标签栏与任务列表共用的 标签 → QColor 缓存；颜色表变化时一次失效两处"""
+    def __init__(self):
+        self._d: Dict[str, QColor] = {}
+        self._overrides: Dict[str, str] = {}
+        self.epoch = 0
+
+    @property
+    def overrides(self) -> Dict[str, str]:
+        return self._overrides
+
+    def set_overrides(self, tag_colors: Optional[Dict[str, str]]):
+        # 复制一份：调用方会原地修改自己的颜色表
+        self._overrides = dict(tag_colors or {})
+        self._d.clear()
+        self.epoch += 1
+
+    def get(self, tag: str) -> QColor:
+        c = self._d.get(tag)
+        if c is None:
+            c = tag_color(tag, self._overrides)
+            self._d[tag] = c
+        return c
+
+
 class TopEditor(QFrame):
     accepted = Signal(str)
     cancelled = Signal()
@@ -92,6 +147,36 @@ class TopEditor(QFrame):
         return super().eventFilter(obj, event)
 
 
+# 全局样式表：启动时由 QApplication.setStyleSheet 安装一次，控件只设 objectName / 动态属性，
+# 避免每个控件、每次切换都重新解析 CSS
+VIEWS_QSS = (
+    "QPushButton#TagBtn{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; padding: 0 9px; font-weight: 700; font-size: 11px;}"
+    "QPushButton#TagBtn:hover{background: rgba(255,255,255,24);} QPushButton#TagBtn:pressed{background: rgba(255,255,255,12);}"
+    # 激活态边框颜色取自按钮调色板的 Highlight（即标签色）
+    "QPushButton#TagBtn[active=\"true\"]{background: rgba(255,255,255,28); border:2px solid palette(highlight); padding: 0 8px; font-weight: 800;}"
+    "QPushButton#TagBtn[active=\"true\"]:hover{background: rgba(255,255,255,34);}"
+    "QPushButton#TagBtn[active=\"true\"]:pressed{background: rgba(255,255,255,12);}"
+    "QFrame#TagUnderline{background: rgba(0,0,0,0); border:none;}"
+    "QPushButton#TagAddBtn, QPushButton#TagBinBtn{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; font-weight: 800;}"
+    "QPushButton#TagAddBtn{font-weight: 900;}"
+    "QPushButton#TagAddBtn:hover, QPushButton#TagBinBtn:hover{background: rgba(255,255,255,24);}"
+    "QPushButton#TagAddBtn:pressed, QPushButton#TagBinBtn:pressed{background: rgba(255,255,255,12);}"
+    "QLabel#FooterSyncLbl{color: rgba(255,255,255,190); padding: 0 6px;}"
+    "QPushButton#FooterSyncBtn{background: rgba(255,255,255,14); border:none; border-radius:8px; color:white; font-weight:800; padding:0 10px;}"
+    "QPushButton#FooterSyncBtn:hover{background: rgba(255,255,255,22);} QPushButton#FooterSyncBtn:pressed{background: rgba(255,255,255,10);}"
+    "QLabel#HeaderTitle{color: rgba(255,255,255,230); font-weight: 900; font-size: 11px;}"
+    "QPushButton#HeaderBtn{background: rgba(255,255,255,16); border:none; border-radius:8px; color:white; font-weight:800;}"
+    "QPushButton#HeaderBtn:hover{background: rgba(255,255,255,24);} QPushButton#HeaderBtn:pressed{background: rgba(255,255,255,12);}"
+    "QLabel#ModeLbl{color: rgba(255,255,255,220); font-weight: 900;}"
+    "QPushButton#ModeBtn{background: rgba(255,255,255,16); border:none; border-radius:10px; color:white; font-weight:800; padding: 0 10px;}"
+    "QPushButton#ModeBtn:hover{background: rgba(255,255,255,24);} QPushButton#ModeBtn:pressed{background: rgba(255,255,255,12);}"
+)
+
+# 同步状态标签的样式表字符串：模块级常量，每处直接引用同一份
+_SYNC_OK_QSS = "QLabel{background: rgba(40,180,110,120); color: white; padding: 0 8px; border-radius: 8px;}"
+_SYNC_ERR_QSS = "QLabel{background: rgba(220,60,60,135); color: white; padding: 0 8px; border-radius: 8px;}"
+
+
 class TagButton(QWidget):
     clicked = Signal()
     def __init__(self, text: str):
@@ -100,31 +185,35 @@ class TagButton(QWidget):
         lay.setContentsMargins(0,0,0,0)
         lay.setSpacing(0)
         self.btn = QPushButton(text)
+        self.btn.setObjectName("TagBtn")
         self.btn.setFixedHeight(20)
-        self.btn.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; padding: 0 9px; font-weight: 700; font-size: 11px;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-        )
         self.underline = QFrame()
+        self.underline.setObjectName("TagUnderline")
         self.underline.setFixedHeight(0)
-        self.underline.setStyleSheet("background: rgba(0,0,0,0); border:none;")
+        self._active: Optional[bool] = None
+        self._color: Optional[QColor] = None
         lay.addWidget(self.btn)
         lay.addWidget(self.underline)
         self.btn.clicked.connect(self.clicked.emit)
 
     def set_active(self, active: bool, color: QColor):
+        active = bool(active)
+        if active == self._active and (not active or color == self._color):
+            return
+        self._active = active
+        self._color = QColor(color)
         if active:
-            self.underline.setStyleSheet(f"background: rgba({color.red()},{color.green()},{color.blue()},230); border:none;")
-            self.btn.setStyleSheet(
-                f"QPushButton{{background: rgba(255,255,255,28); border:2px solid rgba({color.red()},{color.green()},{color.blue()},230); border-radius: 9px; color:white; padding: 0 8px; font-weight: 800; font-size: 11px;}}"
-                "QPushButton:hover{background: rgba(255,255,255,34);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
-        else:
-            self.underline.setStyleSheet("background: rgba(0,0,0,0); border:none;")
-            self.btn.setStyleSheet(
-                "QPushButton{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; padding: 0 9px; font-weight: 700; font-size: 11px;}"
-                "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
+            pal = self.btn.palette()
+            c = QColor(color)
+            c.setAlpha(230)
+            pal.setColor(pal.ColorRole.Highlight, c)
+            self.btn.setPalette(pal)
+        # 只切换动态属性并重新 polish，不重新解析样式表
+        self.btn.setProperty("active", active)
+        st = self.btn.style()
+        st.unpolish(self.btn)
+        st.polish(self.btn)
+        self.btn.update()
 
 
 
@@ -140,17 +229,12 @@ class FooterBar(QWidget):
         lay.setSpacing(8)
 
         self.lbl_sync = QLabel("")
-        self.lbl_sync.setStyleSheet(
-            "QLabel{color: rgba(255,255,255,190); padding: 0 6px;}"
-        )
+        self.lbl_sync.setObjectName("FooterSyncLbl")
         self.lbl_sync.hide()
 
         self.btn_sync = QPushButton("⟳ 手动同步")
+        self.btn_sync.setObjectName("FooterSyncBtn")
         self.btn_sync.setFixedHeight(22)
-        self.btn_sync.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,14); border:none; border-radius:8px; color:white; font-weight:800; padding:0 10px;}"
-            "QPushButton:hover{background: rgba(255,255,255,22);} QPushButton:pressed{background: rgba(255,255,255,10);}"
-        )
 
         self.btn_sync.clicked.connect(self.request_manual_sync.emit)
         lay.addWidget(self.lbl_sync, 1)
@@ -162,10 +246,10 @@ class TagBar(QWidget):
     add_clicked = Signal()
     tag_menu_requested = Signal(str, object)  # (tag, global_pos)
 
-    def __init__(self):
+    def __init__(self, colors: Optional[TagColorCache] = None):
         super().__init__()
-        self._tag_colors: Dict[str, str] = {}
-        self._btns: List[Tuple[str, TagButton]] = []
+        self._colors = colors or TagColorCache()
+        self._btns: Dict[str, TagButton] = {}
 
         lay = QHBoxLayout(self)
         lay.setContentsMargins(2,0,2,0)
@@ -180,55 +264,77 @@ class TagBar(QWidget):
 
         # 右侧“＋”：新增页面（标签）
         self.btn_add_tag = QPushButton("＋")
+        self.btn_add_tag.setObjectName("TagAddBtn")
         self.btn_add_tag.setFixedSize(26, 20)
-        self.btn_add_tag.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; font-weight: 900;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}" 
-        )
         self.btn_add_tag.clicked.connect(self.add_clicked.emit)
         lay.addWidget(self.btn_add_tag)
 
         self.btn_bin = QPushButton("🗑")
+        self.btn_bin.setObjectName("TagBinBtn")
         self.btn_bin.setFixedSize(26, 20)
-        self.btn_bin.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius: 9px; color:white; font-weight: 800;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-        )
         self.btn_bin.clicked.connect(self.bin_clicked.emit)
         lay.addWidget(self.btn_bin)
 
         self._lay = lay
 
     def set_colors(self, tag_colors: Dict[str, str]):
-        self._tag_colors = tag_colors or {}
+        self._colors.set_overrides(tag_colors)
 
     def set_tags(self, tags: List[str], current: str):
-        for _, w in self._btns:
+        tags = list(dict.fromkeys(t for t in tags if t))
+        if list(self._btns) != tags:
+            # 增删/重排按钮期间暂停重绘，最后统一做一次布局
+            self.setUpdatesEnabled(False)
             try:
+                self._sync_buttons(tags)
+            finally:
+                self._lay.activate()
+                self.setUpdatesEnabled(True)
+        colors = self._colors
+        for t, w in self._btns.items():
+            w.set_active(t == current, colors.get(t))
+
+    def _sync_buttons(self, tags: List[str]):
+        order = list(self._btns)
+
+        # 只删掉不再存在的标签按钮
+        keep = set(tags)
+        for t in order:
+            if t not in keep:
+                w = self._btns.pop(t)
                 self._lay.removeWidget(w)
-            except Exception:
-                pass
-            w.hide()
-            w.deleteLater()
-        self._btns.clear()
+                w.hide()
+                w.deleteLater()
+        order = [t for t in order if t in keep]
+
+        # 顺序变化时把保留的按钮移出布局，稍后按新顺序插回（不销毁重建）
+        if order != [t for t in tags if t in self._btns]:
+            for t in order:
+                self._lay.removeWidget(self._btns[t])
+            order = []
 
         # insert after anchor (index 1)
-        insert_at = 1
-        for t in tags:
-            if not t:
-                continue
-            w = TagButton(t)
-            c = tag_color(t, self._tag_colors)
-            w.set_active(t == current, c)
-            w.clicked.connect(lambda _=False, tt=t: self.tag_clicked.emit(tt))
-            # 右键标签（页面）菜单
-            w.setContextMenuPolicy(Qt.CustomContextMenu)
-            w.customContextMenuRequested.connect(
-                lambda p, tt=t, ww=w: self.tag_menu_requested.emit(tt, ww.mapToGlobal(p))
-            )
-            self._lay.insertWidget(insert_at, w)
-            insert_at += 1
-            self._btns.append((t, w))
+        for i, t in enumerate(tags):
+            w = self._btns.get(t)
+            if w is None:
+                w = self._new_button(t)
+                self._btns[t] = w
+            if i >= len(order) or order[i] != t:
+                self._lay.insertWidget(1 + i, w)
+                order.insert(i, t)
+        # 字典顺序与布局顺序保持一致
+        self._btns = {t: self._btns[t] for t in tags}
+
+    def _new_button(self, t: str) -> TagButton:
+        w = TagButton(t)
+        w.clicked.connect(functools.partial(self.tag_clicked.emit, t))
+        # 右键标签（页面）菜单
+        w.setContextMenuPolicy(Qt.CustomContextMenu)
+        w.customContextMenuRequested.connect(functools.partial(self._on_tag_menu, t, w))
+        return w
+
+    def _on_tag_menu(self, tag: str, widget: QWidget, pos: QPoint):
+        self.tag_menu_requested.emit(tag, widget.mapToGlobal(pos))
 
 
 class HeaderBar(QWidget):
@@ -247,7 +353,7 @@ class HeaderBar(QWidget):
         lay.setSpacing(8)
 
         self.title = QLabel(f"LyTodo v{VERSION}")
-        self.title.setStyleSheet("color: rgba(255,255,255,230); font-weight: 900; font-size: 11px;")
+        self.title.setObjectName("HeaderTitle")
 
         self.btn_manage = QPushButton("管理")
         self.btn_sort = QPushButton("⇅")
@@ -255,11 +361,8 @@ class HeaderBar(QWidget):
         self.btn_search = QPushButton("🔍")
         self.btn_settings = QPushButton("⚙")
         for b in (self.btn_manage, self.btn_sort, self.btn_add, self.btn_search, self.btn_settings):
+            b.setObjectName("HeaderBtn")
             b.setFixedSize(26, 20)
-            b.setStyleSheet(
-                "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:8px; color:white; font-weight:800;}"
-                "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
 
         lay.addWidget(self.title)
         lay.addStretch(1)
@@ -286,12 +389,9 @@ class DraggableListView(QListView):
         super().__init__(parent)
         self._drag_row: Optional[int] = None
         self.setDragEnabled(False)
-        self._lp_timer = QTimer(self)
-        self._lp_timer.setSingleShot(True)
-        self._lp_timer.setInterval(260)
-        self._lp_timer.timeout.connect(self._enable_longpress_drag)
+        # 按下位置（仅按在任务行上时记录）；移动超过系统拖动阈值后才允许拖动排序
+        self._press_pos: Optional[QPoint] = None
         self._lp_ready = False
-        self._pressing = False
         self.setAcceptDrops(True)
         self.setDropIndicatorShown(True)
         self.setDragDropMode(QAbstractItemView.InternalMove)
@@ -299,29 +399,24 @@ class DraggableListView(QListView):
         self.setSelectionMode(QAbstractItemView.SingleSelection)
 
 
-    def _enable_longpress_drag(self):
-        if self._pressing:
-            self._lp_ready = True
-            self.setDragEnabled(True)
-
-
     def mousePressEvent(self, e):
-        idx = self.indexAt(e.position().toPoint())
+        # 仅在按下时命中测试一次：拖动源行记在 _drag_row，移动过程中不再调用 indexAt
+        pos = e.position().toPoint()
+        idx = self.indexAt(pos)
         self._drag_row = idx.row() if idx.isValid() else None
-        self._pressing = True
+        self._press_pos = pos if (idx.isValid() and e.button() == Qt.LeftButton) else None
         self._lp_ready = False
         self.setDragEnabled(False)
-        try:
-            self._lp_timer.start()
-        except Exception:
-            pass
         super().mousePressEvent(e)
 
     def mouseMoveEvent(self, e):
-        # 只有长按(约260ms)后才允许拖动排序，避免误触
-        if not self._lp_ready:
-            super().mouseMoveEvent(e)
-            return
+        # 移动距离超过 startDragDistance 才允许拖动排序，避免点击时的轻微抖动误触
+        if self._press_pos is not None and not self._lp_ready:
+            if (e.position().toPoint() - self._press_pos).manhattanLength() <= QApplication.startDragDistance():
+                # 阈值内不交给基类，否则会进入框选状态，之后无法再开始拖动
+                return
+            self._lp_ready = True
+            self.setDragEnabled(True)
         super().mouseMoveEvent(e)
 
     
@@ -335,13 +430,9 @@ class DraggableListView(QListView):
 
 
     def mouseReleaseEvent(self, e):
-        self._pressing = False
+        self._press_pos = None
         self._lp_ready = False
         self.setDragEnabled(False)
-        try:
-            self._lp_timer.stop()
-        except Exception:
-            pass
         super().mouseReleaseEvent(e)
 
 
@@ -358,23 +449,49 @@ class DraggableListView(QListView):
 
 class TaskDelegate(QStyledItemDelegate):
     """任务绘制 Delegate（自适应字号）"""
-    def __init__(self, font_family: str = "", font_size: int = 10, tag_colors: Optional[Dict[str, str]] = None):
+    # 绘制用的固定颜色/对齐方式：类级常量，避免每行每帧重新构造
+    _SEL_BRUSH = QColor(255, 255, 255, 18)
+    _CB_BRUSH = QColor(0, 0, 0, 60)
+    _CHECK_PEN = QColor(255, 255, 255, 220)
+    _TITLE_PEN_ACTIVE = QColor(255, 255, 255, 230)
+    _TITLE_PEN_DONE = QColor(255, 255, 255, 120)
+    _PIN_PEN = QColor(255, 255, 255, 180)
+    _TITLE_ALIGN = Qt.AlignVCenter | Qt.AlignLeft
+
+    def __init__(self, font_family: str = "", font_size: int = 10, tag_colors: Optional[Dict[str, str]] = None,
+                 color_cache: Optional[TagColorCache] = None):
         super().__init__()
         self.font_family = font_family
         self.font_size = int(font_size)
+        self._colors = color_cache or TagColorCache()
         self.tag_colors = tag_colors or {}
-
-    def _font(self) -> QFont:
-        f = QFont()
-        if self.font_family:
-            f.setFamily(self.font_family)
-        f.setPointSize(int(self.font_size))
-        f.setBold(True)
-        return f
-
-    def _layout(self) -> dict:
-        f = self._font()
-        fm = QFontMetrics(f)
+        self._cached_layout = self._compute_layout()
+        self._font_obj: QFont = self._cached_layout["font"]
+        # (标题, 可用宽度) → 省略后的标题；字体变化时清空
+        self._elide_cache: Dict[Tuple[str, int], str] = {}
+
+    def set_font(self, family: str, size: int):
+        """字体变化时重算布局常量（绘制路径只读缓存）"""
+        self.font_family = family
+        self.font_size = int(size)
+        self._cached_layout = self._compute_layout()
+        self._font_obj = self._cached_layout["font"]
+        self._elide_cache.clear()
+
+    @property
+    def tag_colors(self) -> Dict[str, str]:
+        return self._colors.overrides
+
+    @tag_colors.setter
+    def tag_colors(self, tag_colors: Dict[str, str]):
+        self.set_colors(tag_colors)
+
+    def set_colors(self, tag_colors: Optional[Dict[str, str]]):
+        """颜色表变化（含原地修改同一个 dict）后必须调用，使已解析的 QColor 失效"""
+        self._colors.set_overrides(tag_colors)
+
+    def _compute_layout(self) -> dict:
+        f, fm = _get_font_and_fm(self.font_family, self.font_size)
         h = max(8, fm.height())
 
         # 外边距（整体更紧凑）
@@ -387,6 +504,7 @@ class TaskDelegate(QStyledItemDelegate):
         # 色条
         bar_w = max(5, int(h * 0.20))
         bar_pad = max(5, int(h * 0.55))
+        bar_radius = max(3, int(bar_w * 0.6))
 
         # 复选框
         cb_size = max(15, int(h * 1.00))
@@ -409,7 +527,7 @@ class TaskDelegate(QStyledItemDelegate):
             "font": f, "fm": fm, "h": h,
             "outer_x": outer_x, "outer_y": outer_y,
             "inner_x": inner_x,
-            "bar_w": bar_w, "bar_pad": bar_pad,
+            "bar_w": bar_w, "bar_pad": bar_pad, "bar_radius": bar_radius,
             "cb_size": cb_size, "cb_radius": cb_radius,
             "card_radius": card_radius,
             "pin_w": pin_w, "pin_pad": pin_pad,
@@ -417,15 +535,45 @@ class TaskDelegate(QStyledItemDelegate):
         }
 
     def sizeHint(self, option, index):
-        lay = self._layout()
+        lay = self._cached_layout
         return QSize(option.rect.width(), int(lay["row_h"]))
 
+    def _elided(self, title: str, width: int) -> str:
+        key = (title, width)
+        s = self._elide_cache.get(key)
+        if s is None:
+            if len(self._elide_cache) >= 512:
+                self._elide_cache.clear()
+            s = self._cached_layout["fm"].elidedText(title, Qt.ElideRight, width)
+            self._elide_cache[key] = s
+        return s
+
+    def _geom(self, option_rect: QRect) -> Dict[str, QRect]:
+        """一行的各绘制/点击区域：paint 与 editorEvent 共用，保证命中区域与绘制一致"""
+        lay = self._cached_layout
+        ox, oy = lay["outer_x"], lay["outer_y"]
+        rect = option_rect.adjusted(ox, oy, -ox, -oy)
+
+        bar_x = rect.left() + lay["inner_x"]
+        bar = QRect(bar_x, rect.top() + lay["bar_pad"], lay["bar_w"], max(6, rect.height() - lay["bar_pad"] * 2))
+
+        cb_size = lay["cb_size"]
+        cb_x = bar.right() + lay["gap"]
+        cb_y = int(rect.center().y() - cb_size / 2)
+        cb = QRect(cb_x, cb_y, cb_size, cb_size)
+
+        text_left = cb.right() + lay["gap"]
+        pin_reserve = lay["pin_w"] + lay["pin_pad"]
+        title = QRect(text_left, rect.top(), max(10, rect.right() - text_left - pin_reserve), rect.height())
+        pin = QRect(rect.right() - lay["pin_w"] - lay["pin_pad"], rect.top(), lay["pin_w"], rect.height())
+        return {"card": rect, "bar": bar, "cb": cb, "title": title, "pin": pin}
+
     def paint(self, painter: QPainter, option: QStyleOptionViewItem, index):
         painter.save()
         try:
-            lay = self._layout()
-            ox, oy = lay["outer_x"], lay["outer_y"]
-            rect = option.rect.adjusted(ox, oy, -ox, -oy)
+            lay = self._cached_layout
+            g = self._geom(option.rect)
+            rect = g["card"]
 
             is_selected = bool(option.state & QStyle.State_Selected)
             done = bool(index.data(ROLE_DONE))
@@ -433,71 +581,47 @@ class TaskDelegate(QStyledItemDelegate):
             pinned = bool(index.data(ROLE_PINNED))
 
             painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setFont(self._font_obj)
 
             if is_selected:
                 painter.setPen(Qt.NoPen)
-                painter.setBrush(QColor(255, 255, 255, 18))
+                painter.setBrush(self._SEL_BRUSH)
                 painter.drawRoundedRect(rect, lay["card_radius"], lay["card_radius"])
 
             # left tag bar
-            bar_x = rect.left() + lay["inner_x"]
-            bar = QRect(bar_x, rect.top() + lay["bar_pad"], lay["bar_w"], max(6, rect.height() - lay["bar_pad"] * 2))
+            bar = g["bar"]
             painter.setPen(Qt.NoPen)
-            painter.setBrush(tag_color(tag, self.tag_colors))
-            rr = max(3, int(lay["bar_w"] * 0.6))
+            painter.setBrush(self._colors.get(tag))
+            rr = lay["bar_radius"]
             painter.drawRoundedRect(bar, rr, rr)
 
             # checkbox
-            cb_size = lay["cb_size"]
-            cb_x = bar.right() + lay["gap"]
-            cb_y = int(rect.center().y() - cb_size / 2)
-            cb = QRect(cb_x, cb_y, cb_size, cb_size)
-            painter.setBrush(QColor(0, 0, 0, 60))
+            cb = g["cb"]
+            painter.setBrush(self._CB_BRUSH)
             painter.drawRoundedRect(cb, lay["cb_radius"], lay["cb_radius"])
             if done:
-                painter.setPen(QColor(255, 255, 255, 220))
-                painter.setFont(lay["font"])
+                painter.setPen(self._CHECK_PEN)
                 painter.drawText(cb, Qt.AlignCenter, "✓")
 
             # title
-            text_left = cb.right() + lay["gap"]
-            pin_reserve = lay["pin_w"] + lay["pin_pad"]
-            title_rect = QRect(text_left, rect.top(), max(10, rect.right() - text_left - pin_reserve), rect.height())
+            title_rect = g["title"]
             title = str(index.data(Qt.ItemDataRole.DisplayRole) or "")
 
-            painter.setFont(lay["font"])
-            painter.setPen(QColor(255, 255, 255, 230) if not done else QColor(255, 255, 255, 120))
-            painter.drawText(title_rect, Qt.AlignVCenter | Qt.AlignLeft, title)
+            painter.setPen(self._TITLE_PEN_DONE if done else self._TITLE_PEN_ACTIVE)
+            painter.drawText(title_rect, self._TITLE_ALIGN, self._elided(title, title_rect.width()))
 
             if pinned:
-                p_rect = QRect(rect.right() - lay["pin_w"] - lay["pin_pad"], rect.top(), lay["pin_w"], rect.height())
-                painter.setPen(QColor(255, 255, 255, 180))
-                painter.setFont(lay["font"])
-                painter.drawText(p_rect, Qt.AlignCenter, "★")
+                painter.setPen(self._PIN_PEN)
+                painter.drawText(g["pin"], Qt.AlignCenter, "★")
         finally:
             painter.restore()
 
     def editorEvent(self, event, model, option, index):
         if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
-            lay = self._layout()
-            ox, oy = lay["outer_x"], lay["outer_y"]
-            rect = option.rect.adjusted(ox, oy, -ox, -oy)
-
-            bar_x = rect.left() + lay["inner_x"]
-            bar = QRect(bar_x, rect.top() + lay["bar_pad"], lay["bar_w"], max(6, rect.height() - lay["bar_pad"] * 2))
-
-            cb_size = lay["cb_size"]
-            cb_x = bar.right() + lay["gap"]
-            cb_y = int(rect.center().y() - cb_size / 2)
-            cb = QRect(cb_x, cb_y, cb_size, cb_size)
-
+            cb = self._geom(option.rect)["cb"]
             if cb.contains(event.position().toPoint()):
                 try:
-                    real = model.real_index_from_proxy(index.row())
-                    t = model.get_all_tasks()[real]
-                    t.done = not bool(t.done)
-                    t.touch()
-                    model.beginResetModel(); model.endResetModel()
+                    model.toggle_done(model.real_index_from_proxy(index.row()))
                 except Exception:
                     pass
                 return True
@@ -518,7 +642,7 @@ class CompletedModeBar(QWidget):
         lay.setSpacing(8)
 
         self.lbl = QLabel("已完成模式")
-        self.lbl.setStyleSheet("color: rgba(255,255,255,220); font-weight: 900;")
+        self.lbl.setObjectName("ModeLbl")
         lay.addWidget(self.lbl)
         lay.addStretch(1)
 
@@ -528,11 +652,8 @@ class CompletedModeBar(QWidget):
         self.btn_back = QPushButton("返回")
 
         for b in (self.btn_restore, self.btn_delete, self.btn_clear, self.btn_back):
+            b.setObjectName("ModeBtn")
             b.setFixedHeight(28)
-            b.setStyleSheet(
-                "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:10px; color:white; font-weight:800; padding: 0 10px;}"
-                "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
 
         lay.addWidget(self.btn_restore)
         lay.addWidget(self.btn_delete)
@@ -564,11 +685,19 @@ class FramelessMainWindow(QWidget):
     request_search_text = Signal(str)
     request_move_task = Signal(int, int)
     window_geometry_changed = Signal(int,int,int,int)
+    visibility_changed = Signal(bool)
 
     def __init__(self):
         super().__init__()
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.panel_alpha = 160
+        # 由 showEvent/hideEvent 维护，托盘切换显示时无需再调用 isVisible()
+        self._is_visible = False
+        # 拖动/缩放时每个像素都会触发 move/resize：停顿 200ms 后只发出最终几何
+        self._geom_timer = QTimer(self)
+        self._geom_timer.setSingleShot(True)
+        self._geom_timer.setInterval(200)
+        self._geom_timer.timeout.connect(self._emit_geometry)
 
         root = QVBoxLayout(self)
         self._root_layout = root
@@ -578,7 +707,9 @@ class FramelessMainWindow(QWidget):
         self.header = HeaderBar()
         root.addWidget(self.header)
 
-        self.tagbar = TagBar()
+        # 标签栏与任务委托共用同一份颜色缓存
+        self.tag_color_cache = TagColorCache()
+        self.tagbar = TagBar(self.tag_color_cache)
         root.addWidget(self.tagbar)
 
         self.search = QLineEdit()
@@ -652,14 +783,19 @@ class FramelessMainWindow(QWidget):
         self.show()
 
     def set_completed_mode_ui(self, enabled: bool):
-        self.completed_bar.setVisible(bool(enabled))
-        # when in completed mode, disable creating/moving tasks visually
-        self.header.btn_add.setEnabled(not enabled)
-        self.header.btn_sort.setEnabled(not enabled)
-        # 标签栏：完成模式下禁止新增/管理，但允许查看筛选
-        if hasattr(self.tagbar, "btn_add_tag"):
+        # 多个控件的显隐/启用合并为一次重绘
+        self.setUpdatesEnabled(False)
+        try:
+            self.completed_bar.setVisible(bool(enabled))
+            # when in completed mode, disable creating/moving tasks visually
+            self.header.btn_add.setEnabled(not enabled)
+            self.header.btn_sort.setEnabled(not enabled)
+            # 标签栏：完成模式下禁止新增/管理，但允许查看筛选
             self.tagbar.btn_add_tag.setEnabled(not enabled)
-        self.search.setEnabled(True)
+            self.search.setEnabled(True)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
 
     def _on_context(self, pos):
         idx = self.list_view.indexAt(pos)
@@ -696,22 +832,15 @@ class FramelessMainWindow(QWidget):
 
     def set_sync_status(self, text: str, ok: bool = True, auto_clear_ms: int = 2500):
         """在底部状态栏提示同步状态（适用于 --noconsole 的 exe）。"""
-        if not hasattr(self, "footer") or not hasattr(self.footer, "lbl_sync"):
-            return
-
         label = self.footer.lbl_sync
         if not text:
             label.hide()
             return
 
-        if ok:
-            label.setStyleSheet(
-                "QLabel{background: rgba(40,180,110,120); color: white; padding: 0 8px; border-radius: 8px;}"
-            )
-        else:
-            label.setStyleSheet(
-                "QLabel{background: rgba(220,60,60,135); color: white; padding: 0 8px; border-radius: 8px;}"
-            )
+        # 成功/失败状态没变时不重新设置样式表（每次设置都会重新解析）
+        qss = _SYNC_OK_QSS if ok else _SYNC_ERR_QSS
+        if label.styleSheet() != qss:
+            label.setStyleSheet(qss)
 
         label.setText(str(text))
         label.show()
@@ -748,14 +877,40 @@ class FramelessMainWindow(QWidget):
     def resizeEvent(self, e):
         super().resizeEvent(e)
         if self.top_editor.isVisible():
-            self.top_editor.edit.setMinimumHeight(max(220, int(self.height()*0.40)))
+            ed = self.top_editor.edit
+            mh = max(220, int(self.height()*0.40))
+            # 高度变化很小时不改最小高度，避免拖动缩放时反复触发布局失效
+            if abs(mh - ed.minimumHeight()) > 4:
+                ed.setMinimumHeight(mh)
         self._grip.move(self.width()-self._grip.width()-6, self.height()-self._grip.height()-6)
-        self.window_geometry_changed.emit(self.x(), self.y(), self.width(), self.height())
+        self._geom_timer.start()
 
     def moveEvent(self, e):
         super().moveEvent(e)
+        self._geom_timer.start()
+
+    def _emit_geometry(self):
         self.window_geometry_changed.emit(self.x(), self.y(), self.width(), self.height())
 
+    def flush_geometry(self):
+        """立即发出防抖中尚未发出的几何变化（退出前调用）"""
+        if self._geom_timer.isActive():
+            self._geom_timer.stop()
+            self._emit_geometry()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        if not self._is_visible:
+            self._is_visible = True
+            self.visibility_changed.emit(True)
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        # 最小化等系统触发的 spontaneous 隐藏不改变 isVisible()
+        if not e.spontaneous() and self._is_visible:
+            self._is_visible = False
+            self.visibility_changed.emit(False)
+
     def paintEvent(self, e):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing, True)
@@ -763,7 +918,7 @@ class FramelessMainWindow(QWidget):
         # panel overlay
         r = self.rect().adjusted(3,3,-3,-3)
         p.setPen(Qt.NoPen)
-        p.setBrush(QColor(20,25,35,int(self.panel_alpha)))
+        p.setBrush(_panel_brush(int(self.panel_alpha)))
         p.drawRoundedRect(r, 14, 14)
 def closeEvent(self, event):
     # 有托盘时：点击右上角 X 仅隐藏到托盘
@@ -774,394 +929,28 @@ def closeEvent(self, event):
     super().closeEvent(event)
 
 
-class NotesWindow(QWidget):
-    """便签窗口：支持多标签页、右侧 + 新增、右键标签页删除/重命名。"""
-    pages_changed = Signal(list)
-
-    def __init__(self, pages: Optional[List[dict]] = None, parent=None):
-        super().__init__(parent)
-        self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool)
-        self.panel_alpha = 170
-        self.setMinimumSize(520, 420)
-
-        root = QVBoxLayout(self)
-        root.setContentsMargins(10, 10, 10, 10)
-        root.setSpacing(8)
-
-        top = QHBoxLayout()
-        lbl = QLabel("便签")
-        lbl.setStyleSheet("color: rgba(255,255,255,230); font-weight: 900;")
-        top.addWidget(lbl)
-        top.addStretch(1)
-
-        self.btn_close = QPushButton("×")
-        self.btn_close.setFixedSize(32, 26)
-        self.btn_close.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:8px; color:white; font-weight:900;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-        )
-        top.addWidget(self.btn_close)
-        root.addLayout(top)
-
-        self.tabs = QTabWidget()
-        self.tabs.setDocumentMode(True)
-        self.tabs.setMovable(True)
-        root.addWidget(self.tabs, 1)
-
-        # 右上角 + 按钮
-        self.btn_add_tab = QPushButton("＋")
-        self.btn_add_tab.setFixedSize(28, 22)
-        self.btn_add_tab.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:8px; color:white; font-weight:900; padding:0 0;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-        )
-        self.tabs.setCornerWidget(self.btn_add_tab, Qt.TopRightCorner)
-
-        self._debounce = QTimer(self)
-        self._debounce.setSingleShot(True)
-        self._debounce.setInterval(500)
-        self._debounce.timeout.connect(self._emit_pages_changed)
-
-        self._pages: List[dict] = []
-        self.set_pages(pages or [])
-
-        tb = self.tabs.tabBar()
-        tb.setContextMenuPolicy(Qt.CustomContextMenu)
-        tb.customContextMenuRequested.connect(self._on_tab_menu)
-
-        self.btn_add_tab.clicked.connect(self._add_page)
-        self.btn_close.clicked.connect(self.hide)
-        self.tabs.currentChanged.connect(lambda _i: self._debounce.start())
-
-        self._grip = QSizeGrip(self)
-        self._grip.setFixedSize(18, 18)
-
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        self._grip.move(self.width() - self._grip.width() - 6, self.height() - self._grip.height() - 6)
-
-    def paintEvent(self, e):
-        p = QPainter(self)
-        p.setRenderHint(QPainter.Antialiasing, True)
-        r = self.rect().adjusted(3, 3, -3, -3)
-        p.setPen(Qt.NoPen)
-        p.setBrush(QColor(20, 25, 35, int(self.panel_alpha)))
-        p.drawRoundedRect(r, 14, 14)
-
-    def set_pages(self, pages: List[dict]):
-        self._pages = []
-        self.tabs.clear()
-
-        norm = []
-        for p in pages if isinstance(pages, list) else []:
-            if not isinstance(p, dict):
-                continue
-            pid = str(p.get("id") or "")
-            title = str(p.get("title") or "").strip() or "便签"
-            content = str(p.get("content") or "")
-            created_at = float(p.get("created_at", 0.0) or 0.0)
-            updated_at = float(p.get("updated_at", 0.0) or 0.0)
-            norm.append({"id": pid, "title": title, "content": content, "created_at": created_at, "updated_at": updated_at})
-
-        if not norm:
-            norm = [self._new_page_dict("便签 1")]
-
-        for p in norm:
-            self._add_page_widget(p, make_current=False)
-            self._pages.append(p)
-
-        self.tabs.setCurrentIndex(0)
-        self._debounce.start()
-
-    def _new_page_dict(self, title: str) -> dict:
-        import uuid, time
-        return {
-            "id": str(uuid.uuid4()),
-            "title": (title or "").strip() or "便签",
-            "content": "",
-            "created_at": float(time.time()),
-            "updated_at": float(time.time()),
-        }
-
-    def _add_page_widget(self, page: dict, make_current: bool = True):
-        w = QWidget()
-        lay = QVBoxLayout(w)
-        lay.setContentsMargins(8, 8, 8, 8)
-        lay.setSpacing(8)
-
-        ed = QTextEdit()
-        ed.setStyleSheet(
-            "QTextEdit{background: rgba(0,0,0,18); border: 1px solid rgba(255,255,255,18); border-radius: 12px; color: white; padding:8px;}"
-            "QTextEdit:focus{border: 1px solid rgba(255,255,255,35);}"
-        )
-        ed.setPlainText(str(page.get("content") or ""))
-        lay.addWidget(ed, 1)
-
-        idx = self.tabs.addTab(w, str(page.get("title") or "便签"))
-
-        def on_changed():
-            try:
-                i = self.tabs.indexOf(w)
-                if i < 0:
-                    return
-                self._pages[i]["content"] = ed.toPlainText()
-                import time as _t
-                self._pages[i]["updated_at"] = float(_t.time())
-                self._debounce.start()
-            except Exception:
-                pass
-
-        ed.textChanged.connect(on_changed)
-
-        # 双击标签页标题重命名
-        #（Qt 没有原生直接编辑标题，这里用右键菜单做主入口）
-
-        if make_current:
-            self.tabs.setCurrentIndex(idx)
-
-    def _on_tab_menu(self, pos: QPoint):
-        tb = self.tabs.tabBar()
-        idx = tb.tabAt(pos)
-        if idx < 0:
-            return
-
-        menu = QMenu(self)
-        act_rename = menu.addAction("重命名")
-        act_delete = menu.addAction("删除标签页")
-
-        act = menu.exec(tb.mapToGlobal(pos))
-        if act == act_rename:
-            self._rename_page(idx)
-        elif act == act_delete:
-            self._delete_page(idx)
-
-    def _rename_page(self, idx: int):
-        if idx < 0 or idx >= len(self._pages):
-            return
-        cur = str(self._pages[idx].get("title") or "")
-        name = self._prompt("重命名标签页", cur)
-        if not name:
-            return
-        self._pages[idx]["title"] = name
-        self.tabs.setTabText(idx, name)
-        self._debounce.start()
-
-    def _delete_page(self, idx: int):
-        if len(self._pages) <= 1:
-            # 至少保留一个便签页
-            return
-        if idx < 0 or idx >= len(self._pages):
-            return
-        self._pages.pop(idx)
-        self.tabs.removeTab(idx)
-        self._debounce.start()
-
-    def _add_page(self):
-        title = f"便签 {len(self._pages) + 1}"
-        p = self._new_page_dict(title)
-        self._pages.append(p)
-        self._add_page_widget(p, make_current=True)
-
-        # 创建后引导重命名（可选）
-        self._debounce.start()
-
-    def _prompt(self, title: str, default: str = "") -> Optional[str]:
-        dlg = QDialog(self)
-        dlg.setWindowTitle(title)
-        dlg.setFixedSize(320, 140)
-        lay = QVBoxLayout(dlg)
-        ed = QLineEdit()
-        ed.setText(default or "")
-        lay.addWidget(ed)
-        row = QHBoxLayout()
-        row.addStretch(1)
-        b_ok = QPushButton("确定")
-        b_cancel = QPushButton("取消")
-        row.addWidget(b_ok)
-        row.addWidget(b_cancel)
-        lay.addLayout(row)
-        b_ok.clicked.connect(dlg.accept)
-        b_cancel.clicked.connect(dlg.reject)
-        ed.setFocus()
-        ed.selectAll()
-        if dlg.exec():
-            v = ed.text().strip()
-            return v if v else None
-        return None
-
-    def _emit_pages_changed(self):
-        try:
-            self.pages_changed.emit(list(self._pages))
-        except Exception:
-            pass
-
-
-class TrashBinWindow(QWidget):
-    # mode: "completed" or "deleted"
-    request_restore_completed = Signal(list)
-    request_delete_completed_selected = Signal(list)
-    request_clear_all_completed = Signal()
-
-    request_restore_deleted = Signal(list)
-    request_delete_deleted_selected = Signal(list)   # hard delete selected deleted items
-    request_clear_all_deleted = Signal()
-
-    def __init__(self, parent=None):
+class _LazyFontComboBox(QComboBox):
+    """字体下拉框：只预置当前字体，首次展开时才枚举系统字体（不做逐行字体预览）"""
+    def __init__(self, family: str = "", parent=None):
         super().__init__(parent)
-        self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool)
-        self.panel_alpha = 170
-        self.setMinimumSize(420, 360)
-
-        root = QVBoxLayout(self)
-        root.setContentsMargins(10,10,10,10)
-        root.setSpacing(8)
-
-        top = QHBoxLayout()
-        lbl = QLabel("收集箱")
-        lbl.setStyleSheet("color: rgba(255,255,255,230); font-weight: 900;")
-        top.addWidget(lbl); top.addStretch(1)
-        self.btn_close = QPushButton("×")
-        self.btn_close.setFixedSize(32,26)
-        self.btn_close.setStyleSheet(
-            "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:8px; color:white; font-weight:900;}"
-            "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-        )
-        top.addWidget(self.btn_close)
-        root.addLayout(top)
-
-        self.tabs = QTabWidget()
-        root.addWidget(self.tabs, 1)
-
-        # Completed tab
-        self.tab_completed = QWidget()
-        c_lay = QVBoxLayout(self.tab_completed)
-        self.list_completed = QListWidget()
-        self.list_completed.setSelectionMode(QListWidget.ExtendedSelection)
-        self.list_completed.setStyleSheet(
-            "QListWidget{background: rgba(0,0,0,18); border: 1px solid rgba(255,255,255,18); border-radius: 12px; color: white; padding:6px;}"
-            "QListWidget::item{padding:6px; border-radius:8px;} QListWidget::item:selected{background: rgba(255,255,255,16);}"
-        )
-        c_lay.addWidget(self.list_completed, 1)
-
-        c_btns = QHBoxLayout()
-        self.btn_restore_c = QPushButton("恢复选中")
-        self.btn_delete_c = QPushButton("删除选中")
-        self.btn_clear_c = QPushButton("全部清空")
-        for b in (self.btn_restore_c, self.btn_delete_c, self.btn_clear_c):
-            b.setFixedHeight(30)
-            b.setStyleSheet(
-                "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:10px; color:white; font-weight:800; padding: 0 12px;}"
-                "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
-        c_btns.addWidget(self.btn_restore_c)
-        c_btns.addWidget(self.btn_delete_c)
-        c_btns.addStretch(1)
-        c_btns.addWidget(self.btn_clear_c)
-        c_lay.addLayout(c_btns)
-
-        # Deleted tab
-        self.tab_deleted = QWidget()
-        d_lay = QVBoxLayout(self.tab_deleted)
-        self.list_deleted = QListWidget()
-        self.list_deleted.setSelectionMode(QListWidget.ExtendedSelection)
-        self.list_deleted.setStyleSheet(
-            "QListWidget{background: rgba(0,0,0,18); border: 1px solid rgba(255,255,255,18); border-radius: 12px; color: white; padding:6px;}"
-            "QListWidget::item{padding:6px; border-radius:8px;} QListWidget::item:selected{background: rgba(255,255,255,16);}"
-        )
-        d_lay.addWidget(self.list_deleted, 1)
-
-        d_btns = QHBoxLayout()
-        self.btn_restore_d = QPushButton("恢复选中")
-        self.btn_delete_d = QPushButton("彻底删除选中")
-        self.btn_clear_d = QPushButton("全部清空")
-        for b in (self.btn_restore_d, self.btn_delete_d, self.btn_clear_d):
-            b.setFixedHeight(30)
-            b.setStyleSheet(
-                "QPushButton{background: rgba(255,255,255,16); border:none; border-radius:10px; color:white; font-weight:800; padding: 0 12px;}"
-                "QPushButton:hover{background: rgba(255,255,255,24);} QPushButton:pressed{background: rgba(255,255,255,12);}"
-            )
-        d_btns.addWidget(self.btn_restore_d)
-        d_btns.addWidget(self.btn_delete_d)
-        d_btns.addStretch(1)
-        d_btns.addWidget(self.btn_clear_d)
-        d_lay.addLayout(d_btns)
-
-        self.tabs.addTab(self.tab_completed, "已完成")
-        self.tabs.addTab(self.tab_deleted, "已删除")
-
-        self._grip = QSizeGrip(self)
-        self._grip.setFixedSize(18,18)
-
-        self.btn_close.clicked.connect(self.hide)
-        self.btn_restore_c.clicked.connect(self._restore_completed)
-        self.btn_delete_c.clicked.connect(self._delete_completed)
-        self.btn_clear_c.clicked.connect(self.request_clear_all_completed.emit)
-
-        self.btn_restore_d.clicked.connect(self._restore_deleted)
-        self.btn_delete_d.clicked.connect(self._delete_deleted)
-        self.btn_clear_d.clicked.connect(self.request_clear_all_deleted.emit)
-
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        self._grip.move(self.width()-self._grip.width()-6, self.height()-self._grip.height()-6)
-
-    def paintEvent(self, e):
-        p = QPainter(self)
-        p.setRenderHint(QPainter.Antialiasing, True)
-        r = self.rect().adjusted(3,3,-3,-3)
-        p.setPen(Qt.NoPen)
-        p.setBrush(QColor(20,25,35,int(self.panel_alpha)))
-        p.drawRoundedRect(r, 14, 14)
-
-    def set_completed_items(self, items: List[Tuple[int,str]]):
-        self.list_completed.clear()
-        for real_idx, text in items:
-            it = QListWidgetItem(text)
-            it.setData(Qt.UserRole, real_idx)
-            self.list_completed.addItem(it)
-
-    def set_deleted_items(self, items: List[Tuple[int,str]]):
-        self.list_deleted.clear()
-        for real_idx, text in items:
-            it = QListWidgetItem(text)
-            it.setData(Qt.UserRole, real_idx)
-            self.list_deleted.addItem(it)
-
-    def _selected_real(self, which: str) -> List[int]:
-        lw = self.list_completed if which=="c" else self.list_deleted
-        return [int(it.data(Qt.UserRole)) for it in lw.selectedItems()]
-
-    def _remove_selected(self, which: str):
-        lw = self.list_completed if which=="c" else self.list_deleted
-        rows = sorted([lw.row(it) for it in lw.selectedItems()], reverse=True)
-        for r in rows:
-            lw.takeItem(r)
-
-    def _restore_completed(self):
-        idxs = self._selected_real("c")
-        if not idxs: return
-        self.request_restore_completed.emit(idxs)
-        self._remove_selected("c")
-
-    def _delete_completed(self):
-        idxs = self._selected_real("c")
-        if not idxs: return
-        self.request_delete_completed_selected.emit(idxs)
-        self._remove_selected("c")
-
-    def _restore_deleted(self):
-        idxs = self._selected_real("d")
-        if not idxs: return
-        self.request_restore_deleted.emit(idxs)
-        self._remove_selected("d")
-
-    def _delete_deleted(self):
-        idxs = self._selected_real("d")
-        if not idxs: return
-        self.request_delete_deleted_selected.emit(idxs)
-        self._remove_selected("d")
+        self._populated = False
+        if family:
+            self.addItem(family)
+
+    def showPopup(self):
+        if not self._populated:
+            self._populated = True
+            cur = self.currentText()
+            self.blockSignals(True)
+            self.clear()
+            self.addItems(QFontDatabase.families())
+            i = self.findText(cur)
+            if i < 0 and cur:
+                self.insertItem(0, cur)
+                i = 0
+            self.setCurrentIndex(max(0, i))
+            self.blockSignals(False)
+        super().showPopup()
 
 
 class SettingsDialog(QDialog):
@@ -1174,7 +963,30 @@ class SettingsDialog(QDialog):
         root = QVBoxLayout(self)
         tabs = QTabWidget(); root.addWidget(tabs)
 
-        tab_basic = QWidget(); lay = QVBoxLayout(tab_basic)
+        # 各标签页在首次切换到时才构建（先放空白占位页）
+        self._settings = settings
+        self._tabs = tabs
+        self._builders = [self._build_basic, self._build_main, self._build_float, self._build_sync, self._build_hotkey]
+        self._built = [False] * len(self._builders)
+        for title in ("基础", "主窗口", "浮窗", "同步", "快捷键"):
+            tabs.addTab(QWidget(), title)
+        self._ensure_tab(0)
+        tabs.currentChanged.connect(self._ensure_tab)
+
+        bottom = QHBoxLayout(); bottom.addStretch(1)
+        ok = QPushButton("确定"); cancel = QPushButton("取消")
+        bottom.addWidget(ok); bottom.addWidget(cancel)
+        root.addLayout(bottom)
+        ok.clicked.connect(self.accept); cancel.clicked.connect(self.reject)
+
+    def _ensure_tab(self, i: int):
+        if 0 <= i < len(self._builders) and not self._built[i]:
+            self._built[i] = True
+            self._builders[i](self._tabs.widget(i))
+
+    def _build_basic(self, page: QWidget):
+        settings = self._settings
+        lay = QVBoxLayout(page)
         row1 = QHBoxLayout()
         row1.addWidget(QLabel("已完成自动收纳："))
         self.cb_auto_archive = QCheckBox(); self.cb_auto_archive.setChecked(settings.auto_archive_completed)
@@ -1206,14 +1018,13 @@ class SettingsDialog(QDialog):
         b_purge.clicked.connect(self.request_purge_completed.emit)
         lay.addWidget(b_purge)
         lay.addStretch(1)
-        tabs.addTab(tab_basic, "基础")
 
-        tab_main = QWidget(); lay2 = QVBoxLayout(tab_main)
+    def _build_main(self, page: QWidget):
+        settings = self._settings
+        lay2 = QVBoxLayout(page)
         rowf = QHBoxLayout(); rowf.addWidget(QLabel("字体："))
-        self.font_box = QFontComboBox()
         fam = settings.font_family or best_default_font_family()
-        if fam:
-            self.font_box.setCurrentFont(QFont(fam))
+        self.font_box = _LazyFontComboBox(fam)
         rowf.addWidget(self.font_box); rowf.addStretch(1)
         lay2.addLayout(rowf)
 
@@ -1223,9 +1034,10 @@ class SettingsDialog(QDialog):
         lay2.addLayout(rows)
 
         lay2.addStretch(1)
-        tabs.addTab(tab_main, "主窗口")
 
-        tab_float = QWidget(); lay3 = QVBoxLayout(tab_float)
+    def _build_float(self, page: QWidget):
+        settings = self._settings
+        lay3 = QVBoxLayout(page)
         rowt = QHBoxLayout(); rowt.addWidget(QLabel("置顶显示："))
         self.cb_top = QCheckBox(); self.cb_top.setChecked(settings.always_on_top)
         rowt.addWidget(self.cb_top); rowt.addStretch(1)
@@ -1239,10 +1051,10 @@ class SettingsDialog(QDialog):
         lay3.addLayout(rowo)
         self.slider_opacity.valueChanged.connect(lambda v: self.lbl_op.setText(str(int(v))))
         lay3.addStretch(1)
-        tabs.addTab(tab_float, "浮窗")
 
-
-        tab_sync = QWidget(); layS = QVBoxLayout(tab_sync)
+    def _build_sync(self, page: QWidget):
+        settings = self._settings
+        layS = QVBoxLayout(page)
         rowse = QHBoxLayout(); rowse.addWidget(QLabel("启用同步："))
         self.cb_sync = QCheckBox(); self.cb_sync.setChecked(settings.sync_enabled)
         rowse.addWidget(self.cb_sync); rowse.addStretch(1)
@@ -1273,10 +1085,10 @@ class SettingsDialog(QDialog):
         self.cb_sync_timer.setChecked(bool(getattr(settings, "sync_timer_enabled", True)))
         layS.addWidget(self.cb_sync_timer)
         layS.addStretch(1)
-        tabs.addTab(tab_sync, "同步")
-
 
-        tab_hotkey = QWidget(); lay5 = QVBoxLayout(tab_hotkey)
+    def _build_hotkey(self, page: QWidget):
+        settings = self._settings
+        lay5 = QVBoxLayout(page)
         rowh1 = QHBoxLayout(); rowh1.addWidget(QLabel("启用全局快捷键（Windows）："))
         self.cb_hotkey = QCheckBox(); self.cb_hotkey.setChecked(settings.hotkey_enabled)
         rowh1.addWidget(self.cb_hotkey); rowh1.addStretch(1)
@@ -1294,20 +1106,16 @@ class SettingsDialog(QDialog):
 
         lay5.addWidget(QLabel("提示：若快捷键被占用会注册失败，换个组合键即可。"))
         lay5.addStretch(1)
-        tabs.addTab(tab_hotkey, "快捷键")
-
-        bottom = QHBoxLayout(); bottom.addStretch(1)
-        ok = QPushButton("确定"); cancel = QPushButton("取消")
-        bottom.addWidget(ok); bottom.addWidget(cancel)
-        root.addLayout(bottom)
-        ok.clicked.connect(self.accept); cancel.clicked.connect(self.reject)
 
     def get_values(self):
+        # 未打开过的标签页此时补建，控件初值即当前设置
+        for i in range(len(self._builders)):
+            self._ensure_tab(i)
         return {
             "auto_archive_completed": self.cb_auto_archive.isChecked(),
             "show_completed_in_main": self.cb_show_completed.isChecked(),
             "launch_at_startup": self.cb_startup.isChecked(),
-            "font_family": self.font_box.currentFont().family(),
+            "font_family": self.font_box.currentText(),
             "font_size": int(self.spin_font.value()),
             "always_on_top": self.cb_top.isChecked(),
             "panel_opacity": int(self.slider_opacity.value()),
@@ -1337,6 +1145,8 @@ class TagManagerDialog(QDialog):
         if "默认" not in self._tags: self._tags.append("默认")
         if "全部" not in self._tags: self._tags.insert(0,"全部")
         self._colors = dict(tag_colors or {})
+        # hex 字符串 → QColor；以颜色值为键，颜色改动后自然命中新键，无需失效
+        self._qcolor_cache: Dict[str, QColor] = {}
 
         root = QVBoxLayout(self)
         root.addWidget(QLabel("标签列表"))
@@ -1363,62 +1173,84 @@ class TagManagerDialog(QDialog):
         self.btn_color.clicked.connect(self._set_color)
 
     def _reload(self):
-        self.listw.clear()
-        for t in self._tags:
-            it = QListWidgetItem(t)
-            c = QColor(self._colors.get(t,"")) if self._colors.get(t) else None
-            if c and c.isValid():
-                it.setForeground(c)
-            self.listw.addItem(it)
+        lw = self.listw
+        lw.setUpdatesEnabled(False)
+        lw.blockSignals(True)
+        try:
+            lw.clear()
+            for t in self._tags:
+                lw.addItem(self._make_item(t))
+        finally:
+            lw.blockSignals(False)
+            lw.setUpdatesEnabled(True)
+
+    def _make_item(self, tag: str) -> QListWidgetItem:
+        it = QListWidgetItem(tag)
+        c = self._qcolor(self._colors.get(tag, ""))
+        if c is not None:
+            it.setForeground(c)
+        return it
+
+    def _qcolor(self, hex_str: str) -> Optional[QColor]:
+        if not hex_str:
+            return None
+        c = self._qcolor_cache.get(hex_str)
+        if c is None:
+            c = QColor(hex_str)
+            self._qcolor_cache[hex_str] = c
+        return c if c.isValid() else None
+
+    def _selected_item(self) -> Optional[QListWidgetItem]:
+        items = self.listw.selectedItems()
+        return items[0] if items else None
 
     def _selected(self) -> Optional[str]:
-        items = self.listw.selectedItems()
-        return items[0].text() if items else None
+        it = self._selected_item()
+        return it.text() if it else None
 
     def _prompt(self, title: str, default: str="") -> Optional[str]:
-        dlg = QDialog(self); dlg.setWindowTitle(title); dlg.setFixedSize(320,140)
-        lay = QVBoxLayout(dlg)
-        ed = QLineEdit(); ed.setText(default); lay.addWidget(ed)
-        row = QHBoxLayout(); row.addStretch(1)
-        b_ok=QPushButton("确定"); b_cancel=QPushButton("取消")
-        row.addWidget(b_ok); row.addWidget(b_cancel); lay.addLayout(row)
-        b_ok.clicked.connect(dlg.accept); b_cancel.clicked.connect(dlg.reject)
-        if dlg.exec():
-            v = ed.text().strip()
-            return v if v else None
-        return None
+        text, ok = QInputDialog.getText(self, title, "", QLineEdit.Normal, default or "")
+        return (text.strip() or None) if ok else None
 
+    # 编辑只改动受影响的那一行，不整表重建（保留选中与滚动位置）
     def _add(self):
         name = self._prompt("新增标签","")
         if not name or name in self._tags: return
         self._tags.append(name)
-        self._reload(); self.tags_changed.emit(self._tags)
+        self.listw.addItem(self._make_item(name))
+        self.tags_changed.emit(self._tags)
 
     def _rename(self):
-        cur = self._selected()
+        it = self._selected_item()
+        cur = it.text() if it else None
         if not cur or cur in ("默认","全部"): return
         new = self._prompt("重命名标签", cur)
         if not new or new==cur or new in self._tags: return
         i=self._tags.index(cur); self._tags[i]=new
         if cur in self._colors:
             self._colors[new]=self._colors.pop(cur)
-        self._reload(); self.colors_changed.emit(self._colors); self.tags_changed.emit(self._tags)
+        it.setText(new)
+        self.colors_changed.emit(self._colors); self.tags_changed.emit(self._tags)
 
     def _set_color(self):
-        cur = self._selected()
+        it = self._selected_item()
+        cur = it.text() if it else None
         if not cur or cur=="全部": return
-        base = QColor(self._colors.get(cur,"")) if self._colors.get(cur) else QColor(80,180,255)
+        base = self._qcolor(self._colors.get(cur, "")) or QColor(80,180,255)
         c = QColorDialog.getColor(base, self, "选择标签颜色")
         if c.isValid():
             self._colors[cur]=c.name()
-            self._reload(); self.colors_changed.emit(self._colors)
+            it.setForeground(self._qcolor(c.name()) or c)
+            self.colors_changed.emit(self._colors)
 
     def _delete(self):
-        cur = self._selected()
+        it = self._selected_item()
+        cur = it.text() if it else None
         if not cur or cur in ("默认","全部"): return
         self._tags=[t for t in self._tags if t!=cur]
         self._colors.pop(cur, None)
-        self._reload(); self.colors_changed.emit(self._colors); self.tags_changed.emit(self._tags)
+        self.listw.takeItem(self.listw.row(it))
+        self.colors_changed.emit(self._colors); self.tags_changed.emit(self._tags)
 
     def _use(self):
         cur=self._selected()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import functools
 import sys
 
 IS_WINDOWS = sys.platform.startswith("win")
@@ -11,53 +12,74 @@ MOD_CONTROL = 0x0002
 MOD_SHIFT = 0x0004
 MOD_WIN = 0x0008
 
+# 小写修饰键名 → 修饰位
+_MOD_TABLE = {
+    "ctrl": MOD_CONTROL, "control": MOD_CONTROL,
+    "alt": MOD_ALT,
+    "shift": MOD_SHIFT,
+    "win": MOD_WIN, "meta": MOD_WIN, "super": MOD_WIN,
+}
+
 if IS_WINDOWS:
     import ctypes
     from ctypes import wintypes
 
+    from PySide6.QtCore import QAbstractNativeEventFilter
+
     user32 = ctypes.windll.user32
 
+    # 原型只绑定一次，调用时直接传 int 句柄，不再逐次包装 wintypes.HWND
+    user32.RegisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.UINT, wintypes.UINT]
+    user32.RegisterHotKey.restype = wintypes.BOOL
+    user32.UnregisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int]
+    user32.UnregisterHotKey.restype = wintypes.BOOL
+    user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                                    ctypes.c_int, ctypes.c_int, wintypes.UINT]
+    user32.SetWindowPos.restype = wintypes.BOOL
+
     # SetWindowPos
     SWP_NOMOVE = 0x0002
     SWP_NOSIZE = 0x0001
     SWP_NOACTIVATE = 0x0010
+    _SWP_FLAGS = SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE
     HWND_TOPMOST = -1
     HWND_NOTOPMOST = -2
 
     def set_topmost(hwnd: int, topmost: bool):
         h = HWND_TOPMOST if topmost else HWND_NOTOPMOST
-        user32.SetWindowPos(wintypes.HWND(hwnd), wintypes.HWND(h), 0, 0, 0, 0,
-                            SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE)
+        user32.SetWindowPos(hwnd, h, 0, 0, 0, 0, _SWP_FLAGS)
+
+    # 键名 → 虚拟键码：字母/数字、F1–F24 与常用命名键，导入时一次建好
+    _VK_TABLE = {chr(c): c for c in range(0x30, 0x3A)}   # 0–9
+    _VK_TABLE.update({chr(c): c for c in range(0x41, 0x5B)})   # A–Z
+    _VK_TABLE.update({f"F{i}": 0x6F + i for i in range(1, 25)})   # VK_F1 = 0x70
+    _VK_TABLE.update({
+        "TAB": 0x09, "ESC": 0x1B, "SPACE": 0x20,
+        "LEFT": 0x25, "UP": 0x26, "RIGHT": 0x27, "DOWN": 0x28,
+    })
 
     def _vk_from_qt_key(name: str) -> int:
-        # Basic mapping (letters/digits/F-keys)
-        name = name.upper()
-        if len(name) == 1:
-            return ord(name)
-        if name.startswith("F") and name[1:].isdigit():
-            n = int(name[1:])
-            return 0x70 + (n - 1)  # VK_F1 = 0x70
-        mapping = {
-            "TAB": 0x09, "ESC": 0x1B, "SPACE": 0x20,
-            "LEFT": 0x25, "UP": 0x26, "RIGHT": 0x27, "DOWN": 0x28,
-        }
-        return mapping.get(name, 0)
+        k = name.upper()
+        # 表外的单字符键（; , / 等）沿用字符码，与原先行为一致
+        return _VK_TABLE.get(k) or (ord(k) if len(k) == 1 else 0)
 
     def parse_hotkey(seq: str):
+        # 热键字符串基本固定，解析结果按原串缓存
+        return _parse_hotkey_cached(seq or "")
+
+    @functools.lru_cache(maxsize=64)
+    def _parse_hotkey_cached(seq: str):
         # seq like "Ctrl+Alt+T"
-        parts = [p.strip() for p in (seq or "").split("+") if p.strip()]
         mods = 0
         key = ""
-        for p in parts:
-            pl = p.lower()
-            if pl in ("ctrl", "control"):
-                mods |= MOD_CONTROL
-            elif pl == "alt":
-                mods |= MOD_ALT
-            elif pl == "shift":
-                mods |= MOD_SHIFT
-            elif pl in ("win", "meta", "super"):
-                mods |= MOD_WIN
+        for p in seq.split("+"):
+            p = p.strip()
+            if not p:
+                continue
+            # 先按原样查表（全小写配置命中时省去 lower() 的分配）
+            m = _MOD_TABLE.get(p) or _MOD_TABLE.get(p.lower())
+            if m:
+                mods |= m
             else:
                 key = p
         vk = _vk_from_qt_key(key)
@@ -66,19 +88,46 @@ if IS_WINDOWS:
     class GlobalHotkey:
         def __init__(self, hotkey_id: int = 1):
             self.hotkey_id = int(hotkey_id)
+            # 当前已成功注册的 (hwnd, sequence)；未注册时为 None
+            self._last_key = None
 
         def register(self, hwnd: int, sequence: str) -> bool:
+            key = (hwnd, sequence)
+            if key == self._last_key:
+                return True
+            if self._last_key is not None:
+                self.unregister(self._last_key[0])
             mods, vk = parse_hotkey(sequence)
             if vk == 0:
                 return False
-            return bool(user32.RegisterHotKey(wintypes.HWND(hwnd), self.hotkey_id, mods, vk))
+            ok = bool(user32.RegisterHotKey(hwnd, self.hotkey_id, mods, vk))
+            if ok:
+                self._last_key = key
+            return ok
 
         def unregister(self, hwnd: int):
+            self._last_key = None
             try:
-                user32.UnregisterHotKey(wintypes.HWND(hwnd), self.hotkey_id)
+                user32.UnregisterHotKey(hwnd, self.hotkey_id)
             except Exception:
                 pass
 
+    class HotkeyEventFilter(QAbstractNativeEventFilter):
+        """应用级原生事件过滤器：收到本热键的 WM_HOTKEY 时调用 callback。"""
+
+        def __init__(self, hotkey_id: int, callback):
+            super().__init__()
+            self.hotkey_id = int(hotkey_id)
+            self.callback = callback
+
+        def nativeEventFilter(self, eventType, message):
+            # Windows 下 eventType 均为 windows_*_MSG，message 指向 MSG
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == WM_HOTKEY and msg.wParam == self.hotkey_id:
+                self.callback()
+                return True, 0
+            return False, 0
+
 else:
     def set_topmost(hwnd: int, topmost: bool):
         return
@@ -92,3 +141,5 @@ else:
 
         def unregister(self, hwnd: int):
             return
+
+    HotkeyEventFilter = None